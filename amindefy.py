@@ -1,66 +1,357 @@
+import json
 import os
+from io import BytesIO
 from openpyxl import Workbook, load_workbook
 from copy import copy
 
-def amindefy_timesheets(timesheet_folder: str, output_file: str):
+from progress import cancellable_map, progress_total, progress_step
+from timesheet_cache import file_digest
+from timing import timed, timed_iter
+from xlsx_transplant import WorkbookTransplanter, TransplantError
+
+# Ways of building the combined workbook
+ENGINES = ("openpyxl", "xml")
+
+MANIFEST_VERSION = 1
+
+def amindefy_timesheets(timesheet_folder: str, output_file: str, workers: int = 1, engine: str = "openpyxl", incremental: bool = False):
     """
     Combines Excel files into one workbook while preserving formatting.
+    With more than one worker the timesheets are loaded in separate processes.
+    The "xml" engine copies each sheet's XML into the output instead of rebuilding it cell by cell.
+    With incremental=True a manifest is kept next to the output, and later runs only replace,
+    add or remove the sheets of timesheets that changed since.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown amindefy engine {engine}. It must be one of {', '.join(ENGINES)}.")
+
+    # Skip non-Excel files and keep a stable sheet order
+    filenames = sorted(filename for filename in os.listdir(timesheet_folder) if filename.endswith(".xlsx"))
+
+    if incremental and update_timesheets(timesheet_folder, output_file, filenames, workers, engine):
+        return
+
+    if engine == "xml":
+        sheet_names = transplant_timesheets(timesheet_folder, output_file, filenames)
+    else:
+        sheet_names = combine_timesheets(timesheet_folder, output_file, filenames, workers)
+
+    if incremental:
+        file_records = {filename: _file_record(os.path.join(timesheet_folder, filename)) for filename in filenames}
+        _save_manifest(output_file, file_records, dict(zip(filenames, sheet_names)))
+
+    print(f"All timesheets have been combined into {output_file}.")
+
+def combine_timesheets(timesheet_folder: str, output_file: str, filenames: list[str], workers: int = 1) -> list[str]:
+    """
+    Combines Excel files into one workbook by copying them cell by cell with openpyxl.
+    Returns the names of the created sheets.
     """
     # Create a new workbook
     output_wb = Workbook()
     output_wb.remove(output_wb.active)  # Remove default sheet
-    
-    for filename in os.listdir(timesheet_folder):
-        # Skip non-Excel files
-        if not filename.endswith(".xlsx"):
-            continue
 
-        amindefy_timesheet(filename, timesheet_folder, output_wb)
+    # Styles already created in the output workbook, shared by all sheets
+    style_cache = {}
+
+    # Loading may happen in worker processes, but writing happens here in sorted order
+    progress_total(len(filenames))
+    contents_by_file = zip(filenames, _read_all_timesheet_contents(timesheet_folder, filenames, workers))
+    for filename, contents in timed_iter("load timesheet", contents_by_file, item=lambda pair: pair[0]):
+        progress_step(filename)
+        with timed("copy timesheet", filename):
+            write_timesheet_contents(contents, os.path.splitext(filename)[0], output_wb, style_cache)
+
+    sheet_names = output_wb.sheetnames
 
     # Save the output workbook
-    output_wb.save(output_file)
+    with timed("save workbook"):
+        output_wb.save(output_file)
     output_wb.close()
-    print(f"All timesheets have been combined into {output_file}.")
 
-def amindefy_timesheet(filename: str, timesheet_folder: str, output_wb: Workbook):
+    return sheet_names
+
+def transplant_timesheets(timesheet_folder: str, output_file: str, filenames: list[str]) -> list[str]:
+    """
+    Combines Excel files into one workbook at the xlsx/XML level.
+    Timesheets that cannot be copied that way are rebuilt with openpyxl first.
+    Returns the names of the created sheets.
+    """
+    transplanter = WorkbookTransplanter()
+
+    progress_total(len(filenames))
+    for filename in filenames:
+        progress_step(filename)
+        with timed("copy timesheet", filename):
+            _transplant_timesheet(transplanter, timesheet_folder, filename)
+
+    with timed("save workbook"):
+        transplanter.save(output_file)
+
+    return transplanter.sheet_names
+
+
+def _transplant_timesheet(transplanter: WorkbookTransplanter, timesheet_folder: str, filename: str) -> str:
+    """
+    Copy a timesheet in at the XML level, rebuilding it with openpyxl first if needed.
+    Returns the name of its sheet.
+    """
+    file_path = os.path.join(timesheet_folder, filename)
+    sheet_name = os.path.splitext(filename)[0]
+    try:
+        transplanter.add_sheet(file_path, sheet_name)
+    except TransplantError as e:
+        print(f"Copying {filename} through openpyxl: {e}")
+        transplanter.add_sheet(BytesIO(_rebuild_timesheet(read_timesheet_contents(file_path), sheet_name)), sheet_name)
+    return transplanter.sheet_names[-1]
+
+
+def update_timesheets(timesheet_folder: str, output_file: str, filenames: list[str], workers: int = 1, engine: str = "openpyxl") -> bool:
+    """
+    Bring an earlier combined workbook up to date using its manifest.
+    Only sheets of timesheets that were added or changed are built, with the given engine.
+    The other sheets are copied over from the earlier output at the XML level, without being parsed.
+    Returns False if there is no usable earlier output, in which case it must be rebuilt.
+    """
+    manifest = _load_manifest(output_file)
+    if manifest is None or not os.path.exists(output_file) or _output_record(output_file) != manifest["output"]:
+        return False
+
+    previous_records = manifest["files"]
+    sheet_names = manifest["sheets"]
+
+    file_records = {
+        filename: _file_record(os.path.join(timesheet_folder, filename), previous_records.get(filename))
+        for filename in filenames
+    }
+    changed = [
+        filename for filename in filenames
+        if filename not in previous_records or file_records[filename]["sha256"] != previous_records[filename]["sha256"]
+    ]
+    removed = [filename for filename in previous_records if filename not in file_records]
+
+    if not changed and not removed:
+        _save_manifest(output_file, file_records, sheet_names)
+        print(f"All timesheets in {output_file} are already up to date.")
+        return True
+
+    # Drop the old sheets of changed and deleted timesheets
+    for filename in changed + removed:
+        sheet_names.pop(filename, None)
+
+    transplanter = WorkbookTransplanter()
+    with timed("copy unchanged timesheets"):
+        try:
+            transplanter.add_sheets(output_file, list(sheet_names.values()))
+        except TransplantError as e:
+            print(f"Rebuilding {output_file}, as its sheets cannot be copied: {e}")
+            return False
+
+    progress_total(len(changed))
+    if engine == "xml":
+        for filename in changed:
+            progress_step(filename)
+            with timed("copy timesheet", filename):
+                sheet_names[filename] = _transplant_timesheet(transplanter, timesheet_folder, filename)
+    else:
+        contents_by_file = zip(changed, _read_all_timesheet_contents(timesheet_folder, changed, workers))
+        for filename, contents in timed_iter("load timesheet", contents_by_file, item=lambda pair: pair[0]):
+            progress_step(filename)
+            sheet_name = os.path.splitext(filename)[0]
+            with timed("copy timesheet", filename):
+                transplanter.add_sheet(BytesIO(_rebuild_timesheet(contents, sheet_name)), sheet_name)
+            sheet_names[filename] = transplanter.sheet_names[-1]
+
+    # Put the sheets back in sorted filename order, as a full run would
+    transplanter.reorder([sheet_names[filename] for filename in filenames])
+
+    with timed("save workbook"):
+        transplanter.save(output_file)
+
+    _save_manifest(output_file, file_records, sheet_names)
+
+    added = sum(1 for filename in changed if filename not in previous_records)
+    print(f"Updated {len(changed) - added}, added {added} and removed {len(removed)} timesheets in {output_file}.")
+    return True
+
+
+def manifest_path(output_file: str) -> str:
+    return os.path.splitext(output_file)[0] + ".manifest.json"
+
+
+def _load_manifest(output_file: str) -> dict | None:
+    try:
+        with open(manifest_path(output_file), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _save_manifest(output_file: str, file_records: dict[str, dict], sheet_names: dict[str, str]):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "output": _output_record(output_file),
+        "files": file_records,
+        "sheets": {filename: sheet_names[filename] for filename in file_records},
+    }
+    with open(manifest_path(output_file), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _file_record(file_path: str, previous: dict | None = None) -> dict:
+    """
+    Size, mtime and content hash of a timesheet. The hash is reused if size and mtime are unchanged.
+    """
+    stat = os.stat(file_path)
+    if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime_ns:
+        return previous
+
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": file_digest(file_path)}
+
+
+def _output_record(output_file: str) -> dict:
+    # Detects an output that was edited or replaced outside of amindefy
+    stat = os.stat(output_file)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def _read_all_timesheet_contents(timesheet_folder: str, filenames: list[str], workers: int):
+    file_paths = [os.path.join(timesheet_folder, filename) for filename in filenames]
+    return cancellable_map(read_timesheet_contents, file_paths, workers=workers)
+
+
+def _rebuild_timesheet(contents: "TimesheetContents", sheet_name: str) -> bytes:
+    # Same copy as the openpyxl engine, saved as a single sheet workbook
+    wb = Workbook()
+    wb.remove(wb.active)
+    write_timesheet_contents(contents, sheet_name, wb)
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    wb.close()
+    return buffer.getvalue()
+
+
+def amindefy_timesheet(filename: str, timesheet_folder: str, output_wb: Workbook, style_cache: dict | None = None):
     """
     Adds a single timesheet to an existing workbook while preserving formatting.
     """
 
     file_path = os.path.join(timesheet_folder, filename)
 
+    with timed("load timesheet", filename):
+        contents = read_timesheet_contents(file_path)
+
+    # Create new sheet in output workbook
+    sheet_name = os.path.splitext(filename)[0]
+    with timed("copy timesheet", filename):
+        write_timesheet_contents(contents, sheet_name, output_wb, style_cache)
+
+
+class TimesheetContents:
+    """
+    Picklable copy of the active sheet of a timesheet: values, formatting and dimensions.
+    """
+    def __init__(self, cells: list[tuple], styles: list[tuple], column_widths: dict[str, float], row_heights: dict[int, float]):
+        # (row, column, value, style_index) where style_index is None or an index into styles
+        self.cells = cells
+        # Distinct (font, border, fill, number_format, protection, alignment) of the sheet
+        self.styles = styles
+        self.column_widths = column_widths
+        self.row_heights = row_heights
+
+
+def read_timesheet_contents(file_path: str) -> TimesheetContents:
+    """
+    Load a timesheet and copy out everything needed to rebuild its active sheet.
+    """
     # Load source workbook
     source_wb = load_workbook(file_path)
     source_ws = source_wb.active
-    
-    # Create new sheet in output workbook
-    sheet_name = os.path.splitext(filename)[0]
-    output_ws = output_wb.create_sheet(title=sheet_name)
-    
-    # Copy all cells with formatting
+
+    cells = []
+    styles = []
+    # Source style array -> index into styles, so each distinct style is only copied once
+    style_indices = {}
+
     for row in source_ws.iter_rows():
         for cell in row:
-            new_cell = output_ws.cell(
-                row=cell.row, 
-                column=cell.column, 
-                value=cell.value
-            )
-            
-            # Copy formatting
+            style_index = None
             if cell.has_style:
-                new_cell.font = copy(cell.font)
-                new_cell.border = copy(cell.border)
-                new_cell.fill = copy(cell.fill)
-                new_cell.number_format = cell.number_format
-                new_cell.protection = copy(cell.protection)
-                new_cell.alignment = copy(cell.alignment)
+                style_key = tuple(cell._style)
+                style_index = style_indices.get(style_key)
+                if style_index is None:
+                    style_index = style_indices[style_key] = len(styles)
+                    styles.append((
+                        copy(cell.font),
+                        copy(cell.border),
+                        copy(cell.fill),
+                        cell.number_format,
+                        copy(cell.protection),
+                        copy(cell.alignment),
+                    ))
+            cells.append((cell.row, cell.column, cell.value, style_index))
+
+    column_widths = {col_letter: col_dimension.width for col_letter, col_dimension in source_ws.column_dimensions.items()}
+    row_heights = {row_num: row_dimension.height for row_num, row_dimension in source_ws.row_dimensions.items()}
+
+    source_wb.close()
+
+    return TimesheetContents(cells, styles, column_widths, row_heights)
+
+
+def write_timesheet_contents(contents: TimesheetContents, sheet_name: str, output_wb: Workbook, style_cache: dict | None = None):
+    """
+    Add a new sheet to the output workbook from copied timesheet contents and return it.
+    style_cache maps a style to its style array in output_wb and can be shared between sheets.
+    """
+    if style_cache is None:
+        style_cache = {}
+
+    output_ws = output_wb.create_sheet(title=sheet_name)
+
+    # Output style array of each of the sheet's styles, looked up on first use
+    style_arrays = [None] * len(contents.styles)
+
+    # Copy all cells with formatting
+    for row, column, value, style_index in contents.cells:
+        new_cell = output_ws.cell(
+            row=row,
+            column=column,
+            value=value
+        )
+
+        if style_index is None:
+            continue
+
+        style_array = style_arrays[style_index]
+        if style_array is None:
+            style = contents.styles[style_index]
+            style_array = style_cache.get(style)
+            if style_array is None:
+                # First time this style is seen: register it with the output workbook
+                font, border, fill, number_format, protection, alignment = style
+                new_cell.font = font
+                new_cell.border = border
+                new_cell.fill = fill
+                new_cell.number_format = number_format
+                new_cell.protection = protection
+                new_cell.alignment = alignment
+                style_array = style_cache[style] = copy(new_cell._style)
+            style_arrays[style_index] = style_array
+
+        # Reuse the registered style
+        new_cell._style = copy(style_array)
 
     # Copy column dimensions
-    for col_letter, col_dimension in source_ws.column_dimensions.items():
-        output_ws.column_dimensions[col_letter].width = col_dimension.width
-    
+    for col_letter, width in contents.column_widths.items():
+        output_ws.column_dimensions[col_letter].width = width
+
     # Copy row dimensions
-    for row_num, row_dimension in source_ws.row_dimensions.items():
-        output_ws.row_dimensions[row_num].height = row_dimension.height
+    for row_num, height in contents.row_heights.items():
+        output_ws.row_dimensions[row_num].height = height
 
-    source_wb.close()
+    return output_ws
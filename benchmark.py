@@ -0,0 +1,195 @@
+"""
+Benchmark suite for the whole pipeline on synthetic data: times each stage and measures its
+peak memory at several numbers of coaches, and saves the results as JSON to compare runs.
+Exits with 1 if a stage got slower than allowed compared to a previous results file.
+
+    python benchmark.py [--coaches 10 100 1000] [--output results.json] [--compare previous.json]
+
+Stages:
+    read_sign_in_sheet   parse the month sheet of the sign in workbook
+    read_timesheet       pd.read_excel and read_timesheet on every timesheet file
+    amindefy_timesheets  combine the timesheet folder into one workbook
+    check_timesheets     check the combined workbook against the sign in sheet
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from amindefy import amindefy_timesheets
+from check_timesheets import check_timesheets, read_timesheet
+from rates import read_rate_timeline
+from read_sign_in import read_sign_in_sheet
+from synthetic_data import generate_season, SIGN_IN_SHEET_FILENAME, RATES_FILENAME
+
+DEFAULT_COACHES = [10, 100, 1000]
+DEFAULT_SESSIONS = 8
+MONTH = "October"
+
+# A stage is a regression when it takes this many times as long as in the compared run
+DEFAULT_SLOWDOWN = 1.25
+
+RESULTS_FORMAT = 1
+
+
+class Fixture:
+    """
+    Paths of the synthetic files for one number of coaches.
+    """
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.sign_in_sheet = os.path.join(folder, SIGN_IN_SHEET_FILENAME)
+        self.rates_file = os.path.join(folder, RATES_FILENAME)
+        self.timesheet_folder = os.path.join(folder, MONTH)
+        self.amindefied_excel = os.path.join(folder, f"{MONTH} amindefied.xlsx")
+
+
+def stage_read_sign_in_sheet(fixture: Fixture):
+    read_sign_in_sheet(MONTH, fixture.sign_in_sheet, read_rate_timeline(fixture.rates_file), None, None)
+
+
+def stage_read_timesheet(fixture: Fixture):
+    for filename in sorted(os.listdir(fixture.timesheet_folder)):
+        read_timesheet(pd.read_excel(os.path.join(fixture.timesheet_folder, filename)))
+
+
+def stage_amindefy_timesheets(fixture: Fixture):
+    amindefy_timesheets(fixture.timesheet_folder, fixture.amindefied_excel)
+
+
+def stage_check_timesheets(fixture: Fixture):
+    # Uses the workbook written by the amindefy stage
+    check_timesheets(fixture.amindefied_excel, fixture.sign_in_sheet, read_rate_timeline(fixture.rates_file), None, None, MONTH)
+
+
+# In running order, as check_timesheets needs the output of amindefy_timesheets
+STAGES = {
+    "read_sign_in_sheet": stage_read_sign_in_sheet,
+    "read_timesheet": stage_read_timesheet,
+    "amindefy_timesheets": stage_amindefy_timesheets,
+    "check_timesheets": stage_check_timesheets,
+}
+
+
+def measure(stage, fixture: Fixture, repeat: int) -> dict:
+    """
+    Best wall time of repeat runs, then the peak traced memory of one more run.
+    Memory is measured separately as tracing allocations slows the code down.
+    """
+    times = []
+    # The checks print their progress, which would swamp the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stage(fixture)
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            stage(fixture)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {"seconds": min(times), "mean_seconds": sum(times) / len(times), "peak_mb": peak / (1024 * 1024)}
+
+
+def run_benchmarks(coach_counts: list[int], sessions_per_coach: int, repeat: int, stages: list[str], data_dir: str) -> list[dict]:
+    results = []
+    for coaches in coach_counts:
+        folder = os.path.join(data_dir, f"{coaches}-coaches-{sessions_per_coach}-sessions")
+        fixture = Fixture(folder)
+        if not os.path.exists(fixture.sign_in_sheet):
+            print(f"Generating {coaches} coaches...", file=sys.stderr)
+            generate_season(folder, coaches, sessions_per_coach, [MONTH])
+
+        for stage_name in stages:
+            measurement = measure(STAGES[stage_name], fixture, repeat)
+            print(
+                f"{coaches:6d} coaches  {stage_name:20s}  {measurement['seconds']:8.3f}s  {measurement['peak_mb']:8.1f} MB peak",
+                file=sys.stderr,
+            )
+            results.append({"coaches": coaches, "stage": stage_name, **measurement})
+    return results
+
+
+def compare_results(results: list[dict], previous: list[dict], slowdown: float) -> list[str]:
+    """
+    Messages for each stage and number of coaches that takes more than slowdown times as long as before.
+    """
+    previous_seconds = {(result["coaches"], result["stage"]): result["seconds"] for result in previous}
+
+    regressions = []
+    for result in results:
+        before = previous_seconds.get((result["coaches"], result["stage"]))
+        if before is None or before <= 0:
+            continue
+        ratio = result["seconds"] / before
+        print(f"{result['coaches']:6d} coaches  {result['stage']:20s}  {ratio:6.2f}x of previous", file=sys.stderr)
+        if ratio > slowdown:
+            regressions.append(f"{result['stage']} with {result['coaches']} coaches: {before:.3f}s -> {result['seconds']:.3f}s")
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the check and amindefy pipeline on synthetic data.")
+    parser.add_argument("--coaches", type=int, nargs="+", default=DEFAULT_COACHES, help="numbers of coaches to run at")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="sessions per coach")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage, the fastest one is kept")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="stages to run")
+    parser.add_argument("--data-dir", help="keep the generated files in this folder to reuse them (default: a temporary folder)")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON file to check for regressions against")
+    parser.add_argument("--slowdown", type=float, default=DEFAULT_SLOWDOWN, help="slowdown factor counted as a regression")
+    args = parser.parse_args(argv)
+
+    # check_timesheets reads the workbook amindefy_timesheets writes
+    stages = [stage for stage in STAGES if stage in args.stages]
+    if "check_timesheets" in stages and "amindefy_timesheets" not in stages:
+        stages.insert(stages.index("check_timesheets"), "amindefy_timesheets")
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        results = run_benchmarks(args.coaches, args.sessions, args.repeat, stages, data_dir)
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "sessions_per_coach": args.sessions,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+        regressions = compare_results(results, previous, args.slowdown)
+        if regressions:
+            print("\nSlower than allowed:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,146 @@
+import os
+import re
+from contextlib import closing
+from itertools import repeat
+
+from check_timesheets import match_timesheets, read_timesheets, read_timesheet_folder
+from discrepancies import report_discrepancies
+from discrepancies.export import DiscrepancyWriter
+from printing import print_colour, GREEN, RED
+from progress import cancellable_map, progress_total, progress_step, uncounted
+from read_sign_in import read_sign_in_workbook
+from timesheet_cache import TimesheetCache
+from timing import timed
+
+
+def find_season_timesheets(season_folder: str, months: list[str]) -> dict[str, str]:
+    """
+    Pair each month with its timesheets in a season folder: either a combined workbook named
+    after the month (e.g. "September.xlsx") or a folder of timesheets named after the month.
+    When a month has both, the folder is used, as a workbook amindefied from it may be out of date.
+    Months without timesheets are left out.
+    """
+    paths = {}
+    # Sorted so the same folder always gives the same pairs
+    for filename in sorted(os.listdir(season_folder)):
+        path = os.path.join(season_folder, filename)
+        month = os.path.splitext(filename)[0].strip().lower()
+        if os.path.isdir(path):
+            paths[month] = path
+        elif filename.endswith(".xlsx"):
+            paths.setdefault(month, path)
+
+    return {month: paths[month.lower()] for month in months if month.lower() in paths}
+
+
+def check_season(
+    timesheets_by_month: dict[str, str],
+    sign_in_sheet_path,
+    rates,
+    rates_after,
+    rate_change_date,
+    workers: int = 1,
+    reader: str = "pandas",
+    cache_dir: str | None = None,
+    remap_names: bool = False,
+    hours_tolerance: float = 0.0,
+    rate_tolerance: float = 0.0,
+    writer: DiscrepancyWriter | None = None,
+) -> dict[str, list] | None:
+    """
+    Check several months at once. timesheets_by_month maps a month to its amindefied workbook
+    or timesheet folder. The sign in sheet is read once for all months, and with more than one
+    worker the months are checked in separate processes.
+    Prints the discrepancies of each month and a summary, and returns them by month.
+    With a writer, each month is written as soon as it is checked and dropped afterwards,
+    and None is returned.
+    """
+    months = list(timesheets_by_month)
+
+    # Read sign in sheet
+    with timed("read_sign_in_sheet"):
+        sign_in_by_month = read_sign_in_workbook(sign_in_sheet_path, months, rates, rates_after, rate_change_date)
+
+    check_args = (
+        [timesheets_by_month[month] for month in months],
+        [sign_in_by_month[month] for month in months],
+        repeat(reader),
+        repeat(cache_dir),
+        repeat(remap_names),
+        repeat(hours_tolerance),
+        repeat(rate_tolerance),
+    )
+    discrepancies_by_month = {}
+    counts_by_month = {}
+    # Adds up the cache hits and misses of every month, as months may be checked in other processes
+    season_cache = TimesheetCache(cache_dir) if cache_dir else None
+
+    # Progress is counted in months, as months checked in worker processes cannot report their sheets
+    progress_total(len(months))
+
+    # Closed on the way out so a cancelled run stops the worker processes straight away
+    with closing(cancellable_map(_check_month, *check_args, workers=workers)) as results:
+        for month, (discrepancies, cache_counts) in zip(months, results):
+            progress_step(month)
+            if season_cache is not None:
+                season_cache.hits += cache_counts[0]
+                season_cache.misses += cache_counts[1]
+            print(f"\n===== {month} =====")
+            with timed("print_discrepancies", month):
+                report_discrepancies(discrepancies, writer, month)
+            counts_by_month[month] = label_counts(discrepancies)
+            if writer is None:
+                discrepancies_by_month[month] = discrepancies
+
+    print_season_summary(counts_by_month)
+    if season_cache is not None:
+        season_cache.evict()
+        print(f"\n{season_cache.summary()}")
+
+    return discrepancies_by_month if writer is None else None
+
+
+def label_counts(discrepancies) -> dict[str, int]:
+    """
+    How many discrepancies there are of each kind, by readable label.
+    """
+    counts = {}
+    for discrepancy in discrepancies:
+        label = _discrepancy_label(discrepancy)
+        counts[label] = counts.get(label, 0) + 1
+    return counts
+
+
+def print_season_summary(counts_by_month: dict[str, dict[str, int]]):
+    """
+    Print one line per month from the label_counts of its discrepancies.
+    """
+    print("\nSeason summary:")
+    for month, counts in counts_by_month.items():
+        if not counts:
+            print_colour(GREEN, f"{month}: no mismatches")
+            continue
+
+        breakdown = ", ".join(f"{count} {label}" for label, count in counts.items())
+        print_colour(RED, f"{month}: {sum(counts.values())} mismatches ({breakdown})")
+
+
+def _discrepancy_label(discrepancy) -> str:
+    # e.g. TimesheetExtraEntry -> "timesheet extra entry"
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", type(discrepancy).__name__).lower()
+
+
+def _check_month(timesheets_path: str, sign_in_data, reader: str, cache_dir: str | None, remap_names: bool, hours_tolerance: float, rate_tolerance: float) -> tuple[list, tuple[int, int] | None]:
+    """
+    Discrepancies of a month, and the cache hits and misses of its timesheets if there is a cache.
+    """
+    # Sheets are not counted as progress, only months are
+    with uncounted():
+        cache = TimesheetCache(cache_dir) if cache_dir else None
+        if os.path.isdir(timesheets_path):
+            timesheets = read_timesheet_folder(timesheets_path, reader=reader, cache=cache)
+        else:
+            timesheets = read_timesheets(timesheets_path, reader=reader, cache=cache)
+        # The per timesheet progress messages would interleave between months, so leave them out
+        discrepancies = match_timesheets(timesheets, sign_in_data, remap_names, hours_tolerance, rate_tolerance, quiet=True)
+        return discrepancies, (cache.hits, cache.misses) if cache is not None else None
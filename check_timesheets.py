@@ -1,9 +1,21 @@
+import os
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from itertools import chain, islice, repeat
+
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
 
-from read_sign_in import read_sign_in_sheet
-from discrepancies import print_discrepancies
+from read_sign_in import read_sign_in_sheet, SignInCache
+from discrepancies import print_discrepancies, report_discrepancies
 from entry import Entry
-from discrepancies import EmptyTimesheet, InvalidName, TimesheetExtraEntry, SignInExtraEntry
+from timesheet_cache import TimesheetCache, cache_key, file_digest, sheet_digests
+from name_index import NameIndex
+from progress import cancellable_map, progress_total, progress_step
+from timing import timed, timed_iter
+from discrepancies.export import DiscrepancyWriter
+from discrepancies import EmptyTimesheet, InvalidName, RemappedName, TimesheetExtraEntry, SignInExtraEntry, HoursMismatch, RateMismatch
 
 
 DATE_COL = "Date"
@@ -11,6 +23,15 @@ WEEKDAY_COL = "Week day"
 RATE_COL = "Rate of pay (see table below)"
 COL_NAMES = ["Acton hours", "Admin hours", "Safeguarding hours", "GALA day rate", "House Event day rate"]
 
+# Ways of reading the sheets of the amindefied workbook
+READERS = ("pandas", "openpyxl")
+
+# Text pd.read_excel reads as NaN by default, so the openpyxl reader treats it as empty too
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
 def read_timesheet(df) -> tuple[str, list[Entry]]:
     """
     Read a timesheet excel file and return a set of entries
@@ -21,93 +42,586 @@ def read_timesheet(df) -> tuple[str, list[Entry]]:
     name = first_name + " " + last_name
     
     # Get the row index of the header
-    header_row_index = df[df.iloc[:, 0] == DATE_COL].index[0]
+    header_row_index = np.flatnonzero(df.iloc[:, 0].eq(DATE_COL).to_numpy())[0]
 
-    # From df, get all rows after the header row, including the header row
-    table_df = df.iloc[header_row_index:]
-    
-    # Reset the index of the dataframe
-    table_df.reset_index(drop=True, inplace=True)
-    table_df.columns = table_df.iloc[0]
-    table_df = table_df[1:]
+    # From df, get all rows after the header row, using the header row as column names
+    table_df = df.iloc[header_row_index + 1:].set_axis(df.iloc[header_row_index], axis=1)
 
     # Filter rows by those that have a date
-    table_df.dropna(subset=[DATE_COL, WEEKDAY_COL], inplace=True)
-    table_df.reset_index(drop=True, inplace=True)
-    
-    # Create a tuple of (number of hours, start time, end time, rate)
+    table_df = table_df.dropna(subset=[DATE_COL, WEEKDAY_COL])
+
+    # Each row must have exactly one of the hours columns filled in
+    hours_df = table_df[COL_NAMES]
+    filled = hours_df.notna().to_numpy()
+    filled_count = filled.sum(axis=1)
+
+    invalid_rows = np.flatnonzero(filled_count != 1)
+    if len(invalid_rows):
+        row = invalid_rows[0]
+        row_date = table_df[DATE_COL].iloc[row]
+        if filled_count[row] == 0:
+            raise ValueError(f"No hours found for {name} on {row_date}")
+        raise ValueError(f"Multiple hours found in a single row for {name} on {row_date}")
+
+    # Pick the single filled hours cell of every row
+    hours = hours_df.to_numpy(dtype=object)[np.arange(len(hours_df)), filled.argmax(axis=1)]
+    dates = [_cell_date(value, name) for value in table_df[DATE_COL].tolist()]
+    rates = table_df[RATE_COL]
+
+    timesheet_data = [
+        Entry(date=date, hours=float(hours_worked), rate=rate)
+        for date, hours_worked, rate in zip(dates, hours.tolist(), rates.tolist())
+    ]
+
+    return name, timesheet_data
+
+
+def read_timesheet_rows(rows) -> tuple[str, list[Entry]]:
+    """
+    Read a timesheet from raw worksheet rows, as given by openpyxl's iter_rows(values_only=True).
+    Only the name cells and the table columns are looked at and no DataFrame is built.
+    Returns the same result as read_timesheet.
+    """
+    rows = iter(rows)
+
+    # read_timesheet's df uses the first sheet row as its header, so df.iloc[3, 2]
+    # and df.iloc[4, 2] are the third cells of the fifth and sixth sheet rows
+    top_rows = list(islice(rows, 6))
+    first_name = _cell_text(_cell(top_rows[4], 2)).strip()
+    last_name = _cell_text(_cell(top_rows[5], 2)).strip()
+    name = first_name + " " + last_name
+
+    # Find the header row
+    rows = chain(top_rows[1:], rows)
+    for row in rows:
+        if _cell(row, 0) == DATE_COL:
+            header = row
+            break
+    else:
+        raise IndexError(f"No {DATE_COL} header found in timesheet for {name}")
+
+    col_index = {value: i for i, value in enumerate(header) if value is not None}
+    date_index = col_index[DATE_COL]
+    weekday_index = col_index[WEEKDAY_COL]
+    rate_index = col_index[RATE_COL]
+    hours_indices = [col_index[col_name] for col_name in COL_NAMES]
+
     timesheet_data = []
-    
-    for _, row in table_df.iterrows():
-        hours_worked = [col_name for col_name in COL_NAMES if pd.notna(row[col_name])]
+
+    for row in rows:
+        # Filter rows by those that have a date
+        date = _cell(row, date_index)
+        if _is_missing(date) or _is_missing(_cell(row, weekday_index)):
+            continue
+
+        hours_worked = [i for i in hours_indices if not _is_missing(_cell(row, i))]
 
         if not hours_worked:
-            raise ValueError(f"No hours found for {name} on {row[DATE_COL]}")
+            raise ValueError(f"No hours found for {name} on {date}")
         if len(hours_worked) > 1:
-            raise ValueError(f"Multiple hours found in a single row for {name} on {row[DATE_COL]}")
-        
+            raise ValueError(f"Multiple hours found in a single row for {name} on {date}")
+
+        rate = _cell(row, rate_index)
+
         entry = Entry(
-            date=row[DATE_COL].date(),
+            date=_cell_date(date, name),
             hours=float(row[hours_worked[0]]),
-            rate=row[RATE_COL],
+            rate=np.nan if _is_missing(rate) else rate,
         )
         timesheet_data.append(entry)
 
     return name, timesheet_data
 
 
+def _cell_date(value, name: str) -> date:
+    """
+    Date of a Date column cell. Only cells Excel stores as dates are accepted: text like
+    "05/10/2025" could be day or month first, so it is rejected rather than guessed.
+    """
+    # pd.Timestamp is a datetime too
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    raise ValueError(f"Date {value} for {name} is not stored as a date. Please enter it as a date, not text")
+
+
+def _cell(row, index):
+    return row[index] if index < len(row) else None
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, str) and value in NA_STRINGS)
+
+
+def _cell_text(value) -> str:
+    # Match str() of the NaN pandas reads for an empty cell
+    return "nan" if _is_missing(value) else str(value)
+
+
+def read_timesheets(amindefied_excel_path, workers: int = 1, reader: str = "pandas", cache: TimesheetCache | None = None, sheet_names=None):
+    """
+    Read every sheet (or the given sheets) of the amindefied workbook in order.
+    Yields (sheet_name, (name, entries)) for each sheet, or (sheet_name, None) for an empty sheet.
+    With more than one worker the sheets are parsed in separate processes.
+    With a cache, only sheets whose contents are not in the cache yet are parsed.
+    """
+    _check_reader(reader)
+
+    if cache is not None:
+        digests = sheet_digests(amindefied_excel_path)
+        if sheet_names is None:
+            sheet_names = list(digests)
+            progress_total(len(sheet_names))
+        keys = [cache_key(digests[sheet_name], reader) for sheet_name in sheet_names]
+        yield from _read_cached(
+            sheet_names, sheet_names, keys, cache,
+            lambda missing: read_timesheets(amindefied_excel_path, workers, reader, sheet_names=missing),
+        )
+        return
+
+    if workers <= 1:
+        yield from _read_timesheet_sheets(amindefied_excel_path, sheet_names, reader)
+        return
+
+    if sheet_names is None:
+        with pd.ExcelFile(amindefied_excel_path) as xls:
+            sheet_names = xls.sheet_names
+        progress_total(len(sheet_names))
+
+    # Split the sheets into contiguous chunks so results can be consumed in workbook order.
+    # Each process opens the workbook once per chunk rather than once per sheet.
+    chunk_size = max(1, -(-len(sheet_names) // (workers * 4)))
+    chunks = [sheet_names[i:i + chunk_size] for i in range(0, len(sheet_names), chunk_size)]
+
+    for timesheets in cancellable_map(_read_timesheet_chunk, repeat(amindefied_excel_path), chunks, repeat(reader), workers=workers):
+        yield from timesheets
+
+
+def read_timesheet_folder(timesheet_folder, workers: int = 1, reader: str = "pandas", cache: TimesheetCache | None = None, filenames=None):
+    """
+    Read the active sheet of every timesheet file (or the given files) in a folder, in the same order amindefy combines them.
+    Yields (sheet_name, (name, entries)) for each file, or (sheet_name, None) for an empty timesheet.
+    With more than one worker the files are parsed in separate processes.
+    With a cache, only files whose contents are not in the cache yet are parsed.
+    """
+    _check_reader(reader)
+
+    if filenames is None:
+        filenames = sorted(filename for filename in os.listdir(timesheet_folder) if filename.endswith(".xlsx"))
+        progress_total(len(filenames))
+    file_paths = [os.path.join(timesheet_folder, filename) for filename in filenames]
+
+    if cache is not None:
+        keys = [cache_key(file_digest(file_path), reader) for file_path in file_paths]
+        yield from _read_cached(
+            filenames, [os.path.splitext(filename)[0] for filename in filenames], keys, cache,
+            lambda missing: read_timesheet_folder(timesheet_folder, workers, reader, filenames=missing),
+        )
+        return
+
+    yield from cancellable_map(_read_timesheet_file, file_paths, repeat(reader), workers=workers)
+
+
+def _read_cached(items, sheet_names, keys, cache, read_missing):
+    """
+    Yield (sheet_name, timesheet) for each item, from the cache where possible.
+    read_missing is called once with the items that are not cached and must yield them in order.
+    """
+    cached = {}
+    for item, key in zip(items, keys):
+        try:
+            cached[item] = cache[key]
+        except KeyError:
+            pass
+
+    fresh = read_missing([item for item in items if item not in cached])
+
+    for item, sheet_name, key in zip(items, sheet_names, keys):
+        if item in cached:
+            yield sheet_name, cached[item]
+        else:
+            _, timesheet = next(fresh)
+            cache[key] = timesheet
+            yield sheet_name, timesheet
+
+
+def _check_reader(reader):
+    if reader not in READERS:
+        raise ValueError(f"Unknown timesheet reader {reader}. It must be one of {', '.join(READERS)}.")
+
+
+def _read_timesheet_sheets(amindefied_excel_path, sheet_names=None, reader="pandas"):
+    if reader == "openpyxl":
+        with timed("open workbook"):
+            wb = load_workbook(amindefied_excel_path, read_only=True, data_only=True)
+        if sheet_names is None:
+            progress_total(len(wb.sheetnames))
+        try:
+            for sheet_name in wb.sheetnames if sheet_names is None else sheet_names:
+                with timed("read_timesheet_rows", sheet_name):
+                    timesheet = _read_timesheet_ws(wb[sheet_name])
+                yield sheet_name, timesheet
+        finally:
+            wb.close()
+        return
+
+    with timed("open workbook"):
+        xls = pd.ExcelFile(amindefied_excel_path)
+    if sheet_names is None:
+        progress_total(len(xls.sheet_names))
+    with xls:
+        for sheet_name in xls.sheet_names if sheet_names is None else sheet_names:
+            # Read individual timesheet
+            with timed("pd.read_excel", sheet_name):
+                df = pd.read_excel(xls, sheet_name=sheet_name)
+            with timed("read_timesheet", sheet_name):
+                timesheet = _read_timesheet_df(df)
+            yield sheet_name, timesheet
+
+
+def _read_timesheet_file(file_path, reader):
+    # Named like the sheet amindefy would create for the file
+    sheet_name = os.path.splitext(os.path.basename(file_path))[0]
+
+    if reader == "openpyxl":
+        with timed("open workbook", sheet_name):
+            wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            with timed("read_timesheet_rows", sheet_name):
+                return sheet_name, _read_timesheet_ws(wb.active)
+        finally:
+            wb.close()
+
+    with timed("open workbook", sheet_name):
+        xls = pd.ExcelFile(file_path)
+    with xls:
+        # amindefy copies the active sheet, which is not always the first one
+        with timed("pd.read_excel", sheet_name):
+            df = pd.read_excel(xls, sheet_name=xls.book.active.title)
+        with timed("read_timesheet", sheet_name):
+            return sheet_name, _read_timesheet_df(df)
+
+
+def _read_timesheet_df(df):
+    if df.empty:
+        return None
+    return read_timesheet(df)
+
+
+def _read_timesheet_ws(ws):
+    # The size read only sheets give comes from the file's dimension tag, which can be missing
+    # or wrong, so read every row like pandas does
+    ws.reset_dimensions()
+    rows = list(ws.iter_rows(values_only=True))
+    while rows and all(_is_missing(value) for value in rows[-1]):
+        rows.pop()
+
+    # Same as df.empty: nothing below the first row
+    if len(rows) < 2:
+        return None
+    return read_timesheet_rows(rows)
+
+
+def _read_timesheet_chunk(amindefied_excel_path, sheet_names, reader):
+    # Runs in a worker process, so the results must be returned in one picklable list
+    return list(_read_timesheet_sheets(amindefied_excel_path, sheet_names, reader))
+
+
 def check_timesheets(
     amindefied_excel_path,
     sign_in_sheet_path, rates,
     rates_after,
     rate_change_date,
     month,
+    workers: int = 1,
+    reader: str = "pandas",
+    cache_dir: str | None = None,
+    sign_in_cache: SignInCache | None = None,
+    remap_names: bool = False,
+    hours_tolerance: float = 0.0,
+    rate_tolerance: float = 0.0,
+    writer: DiscrepancyWriter | None = None,
 ):
+    """
+    Check an amindefied workbook against the sign in sheet and return the discrepancies found.
+    With a writer, each discrepancy is written as soon as it is found instead and None is returned.
+    """
+    # Read sign in sheet
+    sign_in_data = _read_sign_in(sign_in_cache, month, sign_in_sheet_path, rates, rates_after, rate_change_date)
+
     # Check for discrepancies
-    discrepancies = []
+    cache = TimesheetCache(cache_dir) if cache_dir else None
+    discrepancies = iter_discrepancies(read_timesheets(amindefied_excel_path, workers, reader, cache), sign_in_data, remap_names, hours_tolerance, rate_tolerance)
+
+    return _report(discrepancies, cache, writer, month)
 
+
+def check_timesheet_folder(
+    timesheet_folder,
+    sign_in_sheet_path,
+    rates,
+    rates_after,
+    rate_change_date,
+    month,
+    workers: int = 1,
+    reader: str = "pandas",
+    cache_dir: str | None = None,
+    sign_in_cache: SignInCache | None = None,
+    remap_names: bool = False,
+    hours_tolerance: float = 0.0,
+    rate_tolerance: float = 0.0,
+    writer: DiscrepancyWriter | None = None,
+):
+    """
+    Check every timesheet in a folder directly, without combining them into one workbook first.
+    Returns or writes the discrepancies like check_timesheets.
+    """
     # Read sign in sheet
-    sign_in_data = read_sign_in_sheet(month, sign_in_sheet_path, rates, rates_after, rate_change_date)
+    sign_in_data = _read_sign_in(sign_in_cache, month, sign_in_sheet_path, rates, rates_after, rate_change_date)
 
-    with pd.ExcelFile(amindefied_excel_path) as xls:
-        for sheet_name in xls.sheet_names:
-            # Read individual timesheet
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-            if df.empty:
-                discrepancies.append(EmptyTimesheet(sheet_name=sheet_name))
+    # Check for discrepancies
+    cache = TimesheetCache(cache_dir) if cache_dir else None
+    discrepancies = iter_discrepancies(read_timesheet_folder(timesheet_folder, workers, reader, cache), sign_in_data, remap_names, hours_tolerance, rate_tolerance)
+
+    return _report(discrepancies, cache, writer, month)
+
+
+def _read_sign_in(sign_in_cache: SignInCache | None, *args) -> dict[str, list[Entry]]:
+    with timed("read_sign_in_sheet"):
+        if sign_in_cache is None:
+            return read_sign_in_sheet(*args)
+        return sign_in_cache.read(*args)
+
+
+def _report(discrepancies, cache: TimesheetCache | None, writer: DiscrepancyWriter | None, month: str):
+    if writer is None:
+        discrepancies = list(discrepancies)
+        with timed("print_discrepancies"):
+            print_discrepancies(discrepancies)
+    else:
+        # Checking happens while the discrepancies are written, and is timed as its own stages
+        with timed("print_discrepancies"):
+            report_discrepancies(discrepancies, writer, month)
+        discrepancies = None
+    _close_cache(cache)
+
+    return discrepancies
+
+
+def _close_cache(cache: TimesheetCache | None):
+    if cache is not None:
+        cache.evict()
+        print(f"\n{cache.summary()}")
+
+
+def match_timesheets(
+    timesheets,
+    sign_in_data: dict[str, list[Entry]],
+    remap_names: bool = False,
+    hours_tolerance: float = 0.0,
+    rate_tolerance: float = 0.0,
+    quiet: bool = False,
+) -> list:
+    """
+    Match (sheet_name, timesheet) pairs against the sign in data and return the discrepancies found.
+    With remap_names, a timesheet whose name clearly means one sign in name is checked under that name.
+    Extra entries on both sides for the same coach and date are paired up by pair_near_misses.
+    With quiet, nothing is printed while matching.
+    """
+    return list(iter_discrepancies(timesheets, sign_in_data, remap_names, hours_tolerance, rate_tolerance, quiet))
+
+
+def iter_discrepancies(
+    timesheets,
+    sign_in_data: dict[str, list[Entry]],
+    remap_names: bool = False,
+    hours_tolerance: float = 0.0,
+    rate_tolerance: float = 0.0,
+    quiet: bool = False,
+):
+    """
+    Same as match_timesheets, but yields each discrepancy as soon as it is known.
+    Empty timesheets and invalid names come out while the timesheets are read. Extra entries
+    can only be paired up once every timesheet is matched, so they come out at the end.
+    """
+    extra_entries = []
+
+    # Built once for all timesheets, from the names before any entries are matched
+    name_index = NameIndex(sign_in_data.keys())
+
+    # Time left waiting for each timesheet besides its own stages, e.g. on worker processes or the cache
+    for sheet_name, timesheet in timed_iter("wait for timesheet", timesheets, item=lambda pair: pair[0]):
+        # Stops here between sheets when the run is cancelled
+        progress_step(sheet_name)
+
+        if timesheet is None:
+            yield EmptyTimesheet(sheet_name=sheet_name)
+            continue
+
+        name, timesheet_entries = timesheet
+        found = []
+        with timed("check_timesheet", sheet_name):
+            match_timesheet(name, timesheet_entries, sign_in_data, found, name_index, remap_names, sheet_name, quiet)
+        for discrepancy in found:
+            if isinstance(discrepancy, TimesheetExtraEntry):
+                extra_entries.append(discrepancy)
+            else:
+                yield discrepancy
 
-            check_timesheet(df, sign_in_data, discrepancies)
-    
     # Check for remaining entries in sign in data
-    for name, entries in sign_in_data.items():
-        for entry in entries:
-            discrepancies.append(SignInExtraEntry(name=name, entry=entry))
+    with timed("pair_near_misses"):
+        for name, entries in sign_in_data.items():
+            for entry, count in surplus_entries(entries, []):
+                extra_entries.append(SignInExtraEntry(name=name, entry=entry, count=count))
+
+        paired = pair_near_misses(extra_entries, hours_tolerance, rate_tolerance)
+
+    yield from paired
+
+
+def pair_near_misses(discrepancies: list, hours_tolerance: float = 0.0, rate_tolerance: float = 0.0) -> list:
+    """
+    Pair each extra timesheet entry with an extra sign in entry for the same coach and date
+    that only differs in hours or rate, and report the pair as one HoursMismatch or RateMismatch.
+    Hours and rates within the tolerances count as equal, and pairs equal in both are dropped.
+    Unpaired extra entries are kept, with their counts reduced by what was paired.
+    """
+    # Extra sign in entries by coach and date, with how many of each are still unpaired
+    sign_in_extras = defaultdict(list)
+    unpaired = {}
+    for discrepancy in discrepancies:
+        if isinstance(discrepancy, SignInExtraEntry):
+            sign_in_extras[(discrepancy.name, discrepancy.entry.date)].append(discrepancy)
+            unpaired[id(discrepancy)] = discrepancy.count
+
+    # Discrepancies replacing each extra timesheet entry
+    replacements = {}
+    for discrepancy in discrepancies:
+        if not isinstance(discrepancy, TimesheetExtraEntry):
+            continue
+        candidates = sign_in_extras.get((discrepancy.name, discrepancy.entry.date))
+        if not candidates:
+            continue
+
+        count = discrepancy.count
+        replaced = []
+        for candidate in candidates:
+            if count == 0:
+                break
+            paired = min(count, unpaired[id(candidate)])
+            if paired == 0:
+                continue
+
+            timesheet_entry, sign_in_entry = discrepancy.entry, candidate.entry
+            same_hours = _within(timesheet_entry.hours, sign_in_entry.hours, hours_tolerance)
+            same_rate = _within(timesheet_entry.rate, sign_in_entry.rate, rate_tolerance)
+            if same_hours and same_rate:
+                pair = None
+            elif same_rate:
+                pair = HoursMismatch(name=discrepancy.name, timesheet_entry=timesheet_entry, sign_in_entry=sign_in_entry, count=paired, sheet_name=discrepancy.sheet_name)
+            elif same_hours:
+                pair = RateMismatch(name=discrepancy.name, timesheet_entry=timesheet_entry, sign_in_entry=sign_in_entry, count=paired, sheet_name=discrepancy.sheet_name)
+            else:
+                # Differs in both, so probably not the same session
+                continue
+
+            if pair is not None:
+                replaced.append(pair)
+            count -= paired
+            unpaired[id(candidate)] -= paired
+
+        if count < discrepancy.count:
+            if count:
+                replaced.append(TimesheetExtraEntry(name=discrepancy.name, entry=discrepancy.entry, count=count, sheet_name=discrepancy.sheet_name))
+            replacements[id(discrepancy)] = replaced
+
+    if not replacements:
+        return discrepancies
+
+    paired_discrepancies = []
+    for discrepancy in discrepancies:
+        if id(discrepancy) in replacements:
+            paired_discrepancies.extend(replacements[id(discrepancy)])
+        elif isinstance(discrepancy, SignInExtraEntry) and unpaired[id(discrepancy)] != discrepancy.count:
+            if unpaired[id(discrepancy)]:
+                paired_discrepancies.append(SignInExtraEntry(name=discrepancy.name, entry=discrepancy.entry, count=unpaired[id(discrepancy)]))
+        else:
+            paired_discrepancies.append(discrepancy)
+    return paired_discrepancies
 
-    print_discrepancies(discrepancies)
 
+def _within(a, b, tolerance: float) -> bool:
+    # Half a hundredth of slack, as entries are matched to the hundredth
+    try:
+        return abs(float(a) - float(b)) <= tolerance + 0.005
+    except (TypeError, ValueError):
+        return False
 
-def check_timesheet(df, sign_in_data: dict[str, set[Entry]], discrepancies):
+
+def check_timesheet(df, sign_in_data: dict[str, list[Entry]], discrepancies):
     """
     Check a single timesheet against the sign in data and print any discrepancies found.
     """
     # Read the timesheet
     name, timesheet_entries = read_timesheet(df)
 
+    match_timesheet(name, timesheet_entries, sign_in_data, discrepancies)
+
+
+def match_timesheet(
+    name: str,
+    timesheet_entries: list[Entry],
+    sign_in_data: dict[str, list[Entry]],
+    discrepancies,
+    name_index: NameIndex | None = None,
+    remap_names: bool = False,
+    sheet_name: str | None = None,
+    quiet: bool = False,
+):
+    """
+    Match the entries of an already read timesheet against the sign in data.
+    sheet_name is only used to say where the discrepancies come from.
+    With quiet, the timesheet being checked is not printed.
+    """
     # Check if timesheet name is correct
     if name not in sign_in_data:
-        sign_in_names = list(sign_in_data.keys())
-        discrepancies.append(InvalidName(name=name, sign_in_names=sign_in_names))
-    else:
-        # Make sets for comparison to not modify the original data
-        timesheet_set = set(timesheet_entries)
-        sign_in_set = sign_in_data[name]
+        if name_index is None:
+            name_index = NameIndex(sign_in_data.keys())
+
+        best_match = name_index.best_match(name) if remap_names else None
+        if best_match is None:
+            suggestions = [suggestion for suggestion, _ in name_index.suggest(name)]
+            discrepancies.append(InvalidName(name=name, suggestions=suggestions, sheet_name=sheet_name))
+            return
+
+        # Reported so the guess can be checked, even when nothing else is wrong
+        discrepancies.append(RemappedName(name=name, sign_in_name=best_match, sheet_name=sheet_name))
+        name = best_match
 
-        # For each entry in the timesheet data, match and remove from the sign in data
+    sign_in_entries = sign_in_data[name]
+
+    # Match by count per entry key, keeping duplicates on both sides
+    if not quiet:
         print(f"\nChecking timesheet for {name}...")
-        for entry in timesheet_entries:
-            if entry not in sign_in_set:
-                discrepancies.append(TimesheetExtraEntry(name=name, entry=entry))
-            else:
-                # Successfully matched entry
-                sign_in_set.remove(entry)
-                timesheet_set.remove(entry)
+    for entry, count in surplus_entries(timesheet_entries, sign_in_entries):
+        discrepancies.append(TimesheetExtraEntry(name=name, entry=entry, count=count, sheet_name=sheet_name))
+
+    # Only the unmatched sign in entries are left for later timesheets and the final report
+    sign_in_data[name] = [entry for entry, count in surplus_entries(sign_in_entries, timesheet_entries) for _ in range(count)]
+
+
+def surplus_entries(entries: list[Entry], other_entries: list[Entry]) -> list[tuple[Entry, int]]:
+    """
+    Entries left over after matching entries against other_entries, as (entry, count) pairs:
+    one per distinct entry, with how many more times it occurs than in other_entries.
+    Pairs are in the order the entries first occur.
+    """
+    counts = Counter(entry.key for entry in entries)
+    counts.subtract(entry.key for entry in other_entries)
+
+    first_entries = {}
+    for entry in entries:
+        first_entries.setdefault(entry.key, entry)
+
+    return [(first_entries[key], count) for key, count in counts.items() if count > 0]
@@ -0,0 +1,103 @@
+"""
+Command line interface for running checks without the GUI, e.g. from cron or a payroll pipeline.
+Nothing here may import tkinter, PIL or tkmacosx.
+"""
+import argparse
+import contextlib
+import os
+import sys
+
+from amindefy import amindefy_timesheets, ENGINES
+from check_timesheets import check_timesheets, check_timesheet_folder, READERS
+from discrepancies.export import EXPORT_FORMATS, open_discrepancy_writer
+from rates import get_rates_file_path, read_rate_timeline
+from timing import collect_timings, profile
+
+# Exit codes
+EXIT_OK = 0
+EXIT_DISCREPANCIES = 1
+EXIT_ERROR = 2
+
+
+def main(argv: list[str]) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        with contextlib.ExitStack() as stack:
+            if args.profile:
+                stack.enter_context(profile(args.profile))
+            if args.timings:
+                timer = stack.enter_context(collect_timings())
+                stack.callback(lambda: print(f"\n{timer.summary()}", file=sys.stderr))
+            return args.command(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="run.py", description="Timesheet checker. Run without arguments to start the GUI.")
+    parser.add_argument("--timings", action="store_true", help="print how long each stage took to stderr")
+    parser.add_argument("--profile", metavar="PREFIX", help="write a cProfile profile to PREFIX.prof and a tracemalloc snapshot to PREFIX.tracemalloc")
+    subparsers = parser.add_subparsers(required=True, metavar="command")
+
+    check_parser = subparsers.add_parser(
+        "check",
+        help="check timesheets against the sign in sheet",
+        description="Check timesheets against the sign in sheet. Each discrepancy is written as a record "
+                    "(a line of JSON by default) as soon as it is found, and the exit code is 1 if any were found.",
+    )
+    check_parser.add_argument("timesheets", help="amindefied timesheets workbook, or a folder of timesheets")
+    check_parser.add_argument("sign_in_sheet", help="sign in sheet workbook")
+    check_parser.add_argument("--month", required=True, help="sign in sheet month to check, e.g. October")
+    check_parser.add_argument("--rates", help="rates JSON file (default: the GUI's rates file)")
+    check_parser.add_argument("--output", help="write the records to this file instead of stdout")
+    check_parser.add_argument("--format", choices=EXPORT_FORMATS, help="record format (default: from the --output extension, else jsonl)")
+    check_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of processes reading timesheets")
+    check_parser.add_argument("--reader", choices=READERS, default="openpyxl", help="how timesheets are read")
+    check_parser.add_argument("--cache-dir", help="cache parsed timesheets in this folder")
+    check_parser.add_argument("--remap-names", action="store_true", help="check misspelt timesheet names under the sign in name they clearly mean")
+    check_parser.add_argument("--hours-tolerance", type=float, default=0.0, help="hours differences up to this are not reported")
+    check_parser.add_argument("--rate-tolerance", type=float, default=0.0, help="rate differences up to this are not reported")
+    check_parser.set_defaults(command=run_check)
+
+    amindefy_parser = subparsers.add_parser("amindefy", help="combine a folder of timesheets into one workbook")
+    amindefy_parser.add_argument("folder", help="folder of timesheets")
+    amindefy_parser.add_argument("output", help="combined workbook to write")
+    amindefy_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of processes loading timesheets")
+    amindefy_parser.add_argument("--engine", choices=ENGINES, default="openpyxl", help="how the workbook is built")
+    amindefy_parser.add_argument("--incremental", action="store_true", help="only update the sheets of changed timesheets")
+    amindefy_parser.set_defaults(command=run_amindefy)
+
+    return parser
+
+
+def run_check(args) -> int:
+    timeline = read_rate_timeline(args.rates or get_rates_file_path())
+
+    check = check_timesheet_folder if os.path.isdir(args.timesheets) else check_timesheets
+
+    # Human readable progress goes to stderr so stdout only holds the records
+    with open_discrepancy_writer(args.output, args.format) as writer, contextlib.redirect_stdout(sys.stderr):
+        check(
+            args.timesheets,
+            args.sign_in_sheet,
+            timeline,
+            None,
+            None,
+            args.month,
+            workers=args.workers,
+            reader=args.reader,
+            cache_dir=args.cache_dir,
+            remap_names=args.remap_names,
+            hours_tolerance=args.hours_tolerance,
+            rate_tolerance=args.rate_tolerance,
+            writer=writer,
+        )
+
+    return EXIT_DISCREPANCIES if writer.count else EXIT_OK
+
+
+def run_amindefy(args) -> int:
+    amindefy_timesheets(args.folder, args.output, workers=args.workers, engine=args.engine, incremental=args.incremental)
+    return EXIT_OK
+
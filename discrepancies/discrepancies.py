@@ -2,10 +2,23 @@ from printing import print_colour, GREEN
 
 
 def print_discrepancies(discrepancies):
-    if discrepancies:
+    report_discrepancies(discrepancies)
 
-        print("Mismatches found:")
-        for d in discrepancies:
-            print(d)
-    else:
+
+def report_discrepancies(discrepancies, writer=None, month: str | None = None) -> int:
+    """
+    Print each discrepancy, and write it to writer if given, as it comes out of the
+    discrepancies iterable, so they never all need to be held at once. Returns how many there were.
+    """
+    count = 0
+    for d in discrepancies:
+        if count == 0:
+            print("Mismatches found:")
+        print(d)
+        if writer is not None:
+            writer.write(d, month)
+        count += 1
+
+    if count == 0:
         print_colour(GREEN, "No mismatches found.")
+    return count
@@ -1,4 +1,7 @@
 from .empty_timesheet import *
 from .invalid_name import *
+from .remapped_name import *
 from .timesheet_extra_entry import *
 from .sign_in_extra_entry import *
+from .hours_mismatch import *
+from .rate_mismatch import *
@@ -1,3 +1,38 @@
+# Fields of Discrepancy.to_record, the same for every kind of discrepancy
+RECORD_FIELDS = (
+    "month", "type", "coach", "sheet", "date", "hours", "rate",
+    "sign_in_hours", "sign_in_rate", "count", "suggestions", "sign_in_name",
+)
+
+
 class Discrepancy:
     def __str__(self):
         raise NotImplementedError("Subclasses of Discrepancy must implement __str__")
+
+    def to_dict(self) -> dict:
+        """
+        Plain JSON serialisable form of the discrepancy, with its kind under "type".
+        """
+        raise NotImplementedError("Subclasses of Discrepancy must implement to_dict")
+
+    def to_record(self, month: str | None = None) -> dict:
+        """
+        Flat record with the RECORD_FIELDS, for exporting. Fields that do not apply are None.
+        Hours and rate are the timesheet's where both sides are given.
+        """
+        data = self.to_dict()
+        suggestions = data.get("suggestions")
+        return {
+            "month": month,
+            "type": data["type"],
+            "coach": data.get("name"),
+            "sheet": getattr(self, "sheet_name", None),
+            "date": data.get("date"),
+            "hours": data.get("hours", data.get("timesheet_hours")),
+            "rate": data.get("rate", data.get("timesheet_rate")),
+            "sign_in_hours": data.get("sign_in_hours"),
+            "sign_in_rate": data.get("sign_in_rate"),
+            "count": data.get("count", 1),
+            "suggestions": None if suggestions is None else "; ".join(suggestions),
+            "sign_in_name": data.get("sign_in_name"),
+        }
@@ -5,5 +5,8 @@ class EmptyTimesheet(Discrepancy):
     def __init__(self, sheet_name: str):
         self.sheet_name = sheet_name
     
+    def to_dict(self) -> dict:
+        return {"type": "empty_timesheet", "sheet_name": self.sheet_name}
+
     def __str__(self):
         return f"- {colour_text(RED, f'Empty timesheet: {self.sheet_name}')}"
\ No newline at end of file
@@ -2,11 +2,18 @@ from discrepancies.discrepancy_types.discrepancy import Discrepancy
 from printing import colour_text, RED, YELLOW
 
 class InvalidName(Discrepancy):
-    def __init__(self, name: str, sign_in_names: list[str]):
+    def __init__(self, name: str, suggestions: list[str], sheet_name: str | None = None):
         self.name = name
-        self.sign_in_names = sign_in_names
+        self.sheet_name = sheet_name
+        # Closest sign in sheet names, best first
+        self.suggestions = suggestions
+
+    def to_dict(self) -> dict:
+        return {"type": "invalid_name", "name": self.name, "suggestions": list(self.suggestions)}
 
     def __str__(self):
-        return f"- {colour_text(RED, f'Invalid name in timesheet: {self.name}')}\n" \
-               f"{colour_text(YELLOW, 'Names in sign in sheet are:')}\n" \
-               f"{colour_text(YELLOW, ', '.join(self.sign_in_names))}"
+        if not self.suggestions:
+            hint = colour_text(YELLOW, 'No similar names in sign in sheet')
+        else:
+            hint = colour_text(YELLOW, f"Did you mean: {', '.join(self.suggestions)}?")
+        return f"- {colour_text(RED, f'Invalid name in timesheet: {self.name}')}\n{hint}"
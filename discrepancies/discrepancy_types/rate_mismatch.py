@@ -0,0 +1,27 @@
+from discrepancies.discrepancy_types.discrepancy import Discrepancy
+from printing import colour_text, RED
+from entry import Entry, plain_value
+
+class RateMismatch(Discrepancy):
+    def __init__(self, name: str, timesheet_entry: Entry, sign_in_entry: Entry, count: int = 1, sheet_name: str | None = None):
+        self.name = name
+        self.sheet_name = sheet_name
+        self.timesheet_entry = timesheet_entry
+        self.sign_in_entry = sign_in_entry
+        # How many timesheet entries were paired up like this
+        self.count = count
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "rate_mismatch",
+            "name": self.name,
+            "date": self.timesheet_entry.date.isoformat(),
+            "hours": plain_value(self.timesheet_entry.hours),
+            "timesheet_rate": plain_value(self.timesheet_entry.rate),
+            "sign_in_rate": plain_value(self.sign_in_entry.rate),
+            "count": self.count,
+        }
+
+    def __str__(self):
+        times = f" ({self.count} times)" if self.count > 1 else ""
+        return f"- {colour_text(RED, f'Rate mismatch for {self.name} on {self.timesheet_entry.date} for {self.timesheet_entry.hours} hours: {self.timesheet_entry.rate}/hour in timesheet, {self.sign_in_entry.rate}/hour in sign in sheet{times}')}"
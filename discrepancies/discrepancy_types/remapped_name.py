@@ -0,0 +1,15 @@
+from discrepancies.discrepancy_types.discrepancy import Discrepancy
+from printing import colour_text, YELLOW
+
+class RemappedName(Discrepancy):
+    def __init__(self, name: str, sign_in_name: str, sheet_name: str | None = None):
+        self.name = name
+        self.sheet_name = sheet_name
+        # The sign in sheet name the timesheet was checked under instead
+        self.sign_in_name = sign_in_name
+
+    def to_dict(self) -> dict:
+        return {"type": "remapped_name", "name": self.name, "sign_in_name": self.sign_in_name}
+
+    def __str__(self):
+        return f"- {colour_text(YELLOW, f'Timesheet name {self.name} is taken to mean {self.sign_in_name} from the sign in sheet')}"
@@ -3,9 +3,15 @@ from printing import colour_text, RED
 from entry import Entry
 
 class SignInExtraEntry(Discrepancy):
-    def __init__(self, name: str, entry: Entry):
+    def __init__(self, name: str, entry: Entry, count: int = 1):
         self.name = name
         self.entry = entry
+        # How many more times the entry is in the sign in sheet than it was matched
+        self.count = count
+
+    def to_dict(self) -> dict:
+        return {"type": "sign_in_extra_entry", "name": self.name, **self.entry.to_dict(), "count": self.count}
 
     def __str__(self):
-        return f"- {colour_text(RED, f'Extra entry in sign in sheet for {self.name}: {self.entry.hours} hours on {self.entry.date} at {self.entry.rate}/hour')}"
+        times = f" ({self.count} times)" if self.count > 1 else ""
+        return f"- {colour_text(RED, f'Extra entry in sign in sheet for {self.name}: {self.entry.hours} hours on {self.entry.date} at {self.entry.rate}/hour{times}')}"
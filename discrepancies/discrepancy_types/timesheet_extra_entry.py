@@ -3,9 +3,16 @@ from printing import colour_text, RED
 from entry import Entry
 
 class TimesheetExtraEntry(Discrepancy):
-    def __init__(self, name: str, entry: Entry):
+    def __init__(self, name: str, entry: Entry, count: int = 1, sheet_name: str | None = None):
         self.name = name
         self.entry = entry
+        self.sheet_name = sheet_name
+        # How many more times the entry is in the timesheet than it was matched
+        self.count = count
+
+    def to_dict(self) -> dict:
+        return {"type": "timesheet_extra_entry", "name": self.name, **self.entry.to_dict(), "count": self.count}
 
     def __str__(self):
-        return f"- {colour_text(RED, f'Extra entry in timesheet for {self.name}: {self.entry.hours} hours on {self.entry.date} at {self.entry.rate}/hour')}"
+        times = f" ({self.count} times)" if self.count > 1 else ""
+        return f"- {colour_text(RED, f'Extra entry in timesheet for {self.name}: {self.entry.hours} hours on {self.entry.date} at {self.entry.rate}/hour{times}')}"
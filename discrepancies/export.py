@@ -0,0 +1,117 @@
+"""
+Streaming export of discrepancy records to JSON lines, CSV or Excel, one record at a time.
+"""
+import csv
+import json
+import os
+import sys
+
+from discrepancies.discrepancy_types.discrepancy import RECORD_FIELDS
+
+__all__ = ["EXPORT_FORMATS", "DiscrepancyWriter", "JsonLinesWriter", "CsvWriter", "XlsxWriter", "open_discrepancy_writer"]
+
+EXPORT_FORMATS = ("jsonl", "csv", "xlsx")
+
+# Format used for each file extension
+_EXTENSION_FORMATS = {".jsonl": "jsonl", ".json": "jsonl", ".csv": "csv", ".xlsx": "xlsx"}
+
+
+class DiscrepancyWriter:
+    """
+    Writes the record of each discrepancy as it is given, without keeping them.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def write(self, discrepancy, month: str | None = None):
+        self.write_record(discrepancy.to_record(month))
+        self.count += 1
+
+    def write_record(self, record: dict):
+        raise NotImplementedError("Subclasses of DiscrepancyWriter must implement write_record")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonLinesWriter(DiscrepancyWriter):
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def write_record(self, record: dict):
+        # Fails rather than writing NaN, which is not JSON
+        self.stream.write(json.dumps(record, allow_nan=False) + "\n")
+
+    def close(self):
+        self.stream.flush()
+
+
+class CsvWriter(DiscrepancyWriter):
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=RECORD_FIELDS)
+        self.writer.writeheader()
+
+    def write_record(self, record: dict):
+        self.writer.writerow(record)
+
+    def close(self):
+        self.stream.flush()
+
+
+class XlsxWriter(DiscrepancyWriter):
+    """
+    Rows are appended to a write-only workbook, which openpyxl streams to a temporary file
+    instead of keeping them in memory. The workbook is only saved to output_file on close.
+    """
+    def __init__(self, output_file: str):
+        # Only loaded when exporting to Excel
+        from openpyxl import Workbook
+
+        super().__init__()
+        self.output_file = output_file
+        self.workbook = Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet("Discrepancies")
+        self.worksheet.append(RECORD_FIELDS)
+
+    def write_record(self, record: dict):
+        self.worksheet.append([record[field] for field in RECORD_FIELDS])
+
+    def close(self):
+        self.workbook.save(self.output_file)
+
+
+def open_discrepancy_writer(output_file: str | None, format: str | None = None) -> DiscrepancyWriter:
+    """
+    Writer for output_file, or for stdout if it is None. The format is guessed from the
+    file extension when not given, and defaults to JSON lines.
+    """
+    if format is None:
+        extension = os.path.splitext(output_file)[1].lower() if output_file else ""
+        format = _EXTENSION_FORMATS.get(extension, "jsonl")
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {format}. It must be one of {', '.join(EXPORT_FORMATS)}.")
+
+    if format == "xlsx":
+        if output_file is None:
+            raise ValueError("An output file is needed to export to Excel")
+        return XlsxWriter(output_file)
+
+    stream = sys.stdout if output_file is None else open(output_file, "w", newline="" if format == "csv" else None)
+    writer = JsonLinesWriter(stream) if format == "jsonl" else CsvWriter(stream)
+    if output_file is not None:
+        # Close the file along with the writer
+        close = writer.close
+        def close_file():
+            close()
+            stream.close()
+        writer.close = close_file
+    return writer
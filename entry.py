@@ -1,15 +1,61 @@
+import math
+import numbers
 from datetime import date
 
+
+def entry_key(date: date, hours: float, rate: float) -> tuple:
+    """
+    Exact key of an entry. Hours are rounded to hundredths and rates to pence,
+    so float noise like 2.4999999 hours or a rate of 14 vs 14.0 does not matter.
+    """
+    return (date.toordinal(), _hundredths(hours), _hundredths(rate))
+
+
+def _hundredths(value) -> int | tuple | None:
+    # Hours or rates that are not numbers keep their own identity, so such an entry only equals
+    # another with the same field: None for a missing field (None or NaN), else the text itself
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return ("text", str(value).strip())
+    if number != number:
+        return None
+    try:
+        return round(number * 100)
+    except OverflowError:
+        return ("text", str(value).strip())
+
+
+def plain_value(value):
+    """
+    Hours or rate as a plain JSON serialisable value: a Python int or float, or the text as given.
+    Missing or infinite values, which JSON has no number for, are None.
+    """
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+
 class Entry:
+    __slots__ = ("date", "hours", "rate", "key")
+
     def __init__(self, date: date, hours: float, rate: float):
         self.date = date
         self.hours = hours
         self.rate = rate
-    
+        self.key = entry_key(date, hours, rate)
+
     def __eq__(self, other):
         if not isinstance(other, Entry):
-            raise NotImplementedError("Can only compare Entry with another Entry")
-        return (self.date, self.hours, self.rate) == (other.date, other.hours, other.rate)
+            return NotImplemented
+        return self.key == other.key
 
     def __hash__(self):
-        return hash((self.date, self.hours, self.rate))
+        return hash(self.key)
+
+    def to_dict(self) -> dict:
+        return {"date": self.date.isoformat(), "hours": plain_value(self.hours), "rate": plain_value(self.rate)}
@@ -4,35 +4,34 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from tkmacosx import Button
 import os
-import platform
 import threading
 import sys
 import re
-from PIL import Image, ImageTk
-import json
+import importlib
+import contextlib
+import queue
+import time
+import traceback
 from datetime import datetime
 
-from check_timesheets import check_timesheets
-from amindefy import amindefy_timesheets
+from rates import (
+    RATE_LEVELS, RATE_CHANGE_DATE_FORMAT, RateTimeline,
+    get_rates_file_path, read_rate_timeline, write_rate_timeline, parse_rate_change_date,
+)
+from results_table import ResultsTable
+from progress import JobProgress, RunCancelled, track_progress
 from colours import *
 from printing import RED, YELLOW, GREEN, RESET
 
-# Get different path depending on Windows vs Mac
-def get_rates_file_path():
-    system = platform.system()
-    if system == "Windows":
-        return os.path.join(os.path.expanduser("~"), "AppData", "Local", "AutoTimesheetChecker", "rates.json")
-    elif system == "Darwin":
-        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "AutoTimesheetChecker", "rates.json")
-    else:
-        raise NotImplementedError(f"Unsupported OS: {system}")
-
 RATES_FILE = get_rates_file_path()
 
-RATE_LEVELS = [
-    "L1", "L2", "NQL2", "Enhanced L2", "Lower Enhanced L2",
-    "Safeguarding", "Admin", "Gala Full Day", "Gala Half Day"
-]
+# Parsed timesheets and sign in sheets are cached next to the rates file
+TIMESHEET_CACHE_DIR = os.path.join(os.path.dirname(RATES_FILE), "timesheet_cache")
+SIGN_IN_CACHE_DIR = os.path.join(os.path.dirname(RATES_FILE), "sign_in_cache")
+
+# pandas, openpyxl and PIL are only imported by the modules that need them, after the window
+# is shown. These are the modules imported in the background once the window is up.
+WARM_UP_MODULES = ["read_sign_in", "check_timesheets", "check_season", "amindefy"]
 
 # The months considered for timesheets. The swimming year is September-July
 MONTHS = [
@@ -40,80 +39,288 @@ MONTHS = [
     "February", "March", "April", "May", "June", "July"
 ]
 
-class OutputCapture:
-    """Context manager to capture print statements and user input"""
-    def __init__(self, output_widget, input_callback=None):
-        self.output_widget = output_widget
+# Colour tag of each ANSI colour code printed by the checks. RESET goes back to no tag
+ANSI_PATTERN = re.compile(r'\033\[(\d+)m')
+ANSI_TAGS = {RED: "red", YELLOW: "yellow", GREEN: "green", RESET: None}
+
+# How often queued output is written to the output widget
+DRAIN_INTERVAL_MS = 50
+
+# Queued in place of text to empty the output widget
+_CLEAR = object()
+
+# The timesheets to check come from one of these inputs, whichever was selected last,
+# with the name shown for it
+TIMESHEET_INPUTS = {'amindefied_excel': "Excel file", 'timesheet_folder': "folder"}
+
+# How often the progress bar is updated while a job runs
+PROGRESS_INTERVAL_MS = 100
+
+
+class ThreadRoutedStream:
+    """
+    Stand-in for sys.stdout or sys.stdin that sends each thread's calls to the target it set,
+    or to the original stream. Installed once, so capturing threads never swap the global stream.
+    """
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, "target", None) or self.original
+
+    def write(self, text):
+        target = self._target()
+        if target is None:
+            # No console, e.g. a windowed PyInstaller build
+            return len(text)
+        return target.write(text)
+
+    def flush(self):
+        target = self._target()
+        if target is not None:
+            target.flush()
+
+    def readline(self):
+        target = self._target()
+        return target.readline() if target is not None else "\n"
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+def install_output_routing():
+    """
+    Route sys.stdout and sys.stdin per thread. Must be called from the main thread.
+    """
+    if not isinstance(sys.stdout, ThreadRoutedStream):
+        sys.stdout = ThreadRoutedStream(sys.stdout)
+    if not isinstance(sys.stdin, ThreadRoutedStream):
+        sys.stdin = ThreadRoutedStream(sys.stdin)
+
+
+class _InputReader:
+    def __init__(self, input_callback):
         self.input_callback = input_callback
-        self.old_stdout = None
-        self.old_stdin = None
-        
-    def __enter__(self):
-        self.old_stdout = sys.stdout
-        self.old_stdin = sys.stdin
-        sys.stdout = self
-        if self.input_callback:
-            sys.stdin = self
-        return self
-        
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout = self.old_stdout
-        sys.stdin = self.old_stdin
-        
+
+    def readline(self):
+        return self.input_callback()
+
+
+class OutputChannel:
+    """
+    Thread safe channel from worker threads to the output widget.
+    Writes only queue the text. The Tk loop takes everything queued every DRAIN_INTERVAL_MS
+    and inserts it with a single call, so long runs cannot flood the event queue.
+    """
+    def __init__(self, output_widget):
+        self.output_widget = output_widget
+        self.queue = queue.SimpleQueue()
+        install_output_routing()
+        self._drain()
+
     def write(self, text):
-        # Write all text, including newlines
-        if self.output_widget.winfo_exists():
-            try:
-                self.output_widget.after_idle(lambda: self._write_to_widget(text))
-            except tk.TclError:
-                pass  # Widget destroyed
+        self.queue.put(text)
         return len(text)
-        
-    def _write_to_widget(self, text):
+
+    def flush(self):
+        pass
+
+    def clear(self):
+        # Queued too, so it stays in order with the writes around it
+        self.queue.put(_CLEAR)
+
+    def call_soon(self, func):
+        """
+        Run func on the Tk thread, once the output queued before it is shown.
+        """
+        self.queue.put(func)
+
+    @contextlib.contextmanager
+    def capture(self, input_callback=None):
+        """
+        Send the calling thread's print statements, and input with an input_callback, to the channel.
+        """
+        stdout_local = sys.stdout.local
+        stdin_local = sys.stdin.local
+        stdout_local.target = self
+        if input_callback:
+            stdin_local.target = _InputReader(input_callback)
         try:
-            if not self.output_widget.winfo_exists():
-                return
-                
-            self.output_widget.config(state='normal')
-            self._insert_coloured_text(text)
-            self.output_widget.see(tk.END)
-            self.output_widget.config(state='disabled')
+            yield self
+        finally:
+            stdout_local.target = None
+            stdin_local.target = None
+
+    def _drain(self):
+        texts = []
+        cleared = False
+        destroyed = False
+        try:
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _CLEAR:
+                    texts.clear()
+                    cleared = True
+                elif callable(item):
+                    if cleared or texts:
+                        self._write_to_widget(cleared, texts)
+                    texts = []
+                    cleared = False
+                    self._call(item)
+                else:
+                    texts.append(item)
+
+            if cleared or texts:
+                self._write_to_widget(cleared, texts)
         except tk.TclError:
-            pass  # Widget destroyed or not accessible
-    
-    def _insert_coloured_text(self, text):
-        """Insert text with colour support by parsing ANSI escape codes"""
-        # ANSI colour code pattern
-        ansi_pattern = r'\033\[(\d+)m'
-        
-        # Split text by ANSI codes
-        parts = re.split(ansi_pattern, text)
-        
-        current_colour = None
+            destroyed = True  # Widget destroyed
+        finally:
+            # Whatever went wrong, keep showing output and running the callbacks queued later
+            if not destroyed:
+                self.output_widget.after(DRAIN_INTERVAL_MS, self._drain)
+
+    def _call(self, func):
+        # A failing callback, e.g. showing the results, must not stop the ones after it,
+        # like the one finishing the job
+        try:
+            func()
+        except Exception as e:
+            traceback.print_exc()
+            self._write_to_widget(False, [f"\n❌ ERROR: {e}\n"])
+
+    def _write_to_widget(self, cleared, texts):
+        self.output_widget.config(state='normal')
+        if cleared:
+            self.output_widget.delete(1.0, tk.END)
+        if texts:
+            self.output_widget.insert(tk.END, *coloured_segments(texts))
+        self.output_widget.see(tk.END)
+        self.output_widget.config(state='disabled')
+
+
+def coloured_segments(texts) -> list:
+    """
+    Split texts on their ANSI colour codes into alternating text and tag arguments for
+    Text.insert, merging neighbouring parts of the same colour. Each text starts uncoloured.
+    """
+    args = []
+    for text in texts:
+        parts = ANSI_PATTERN.split(text)
+        current_tag = None
         for i, part in enumerate(parts):
-            if i % 2 == 0:  # Text part
-                if current_colour:
-                    self.output_widget.insert(tk.END, part, current_colour)
+            if i % 2:  # colour code part
+                current_tag = ANSI_TAGS.get(int(part), current_tag)
+            elif part:  # Text part
+                tags = (current_tag,) if current_tag else ()
+                if args and args[-1] == tags:
+                    args[-2] += part
                 else:
-                    self.output_widget.insert(tk.END, part)
-            else:  # colour code part
-                colour_code = int(part)
-                if colour_code == RED:
-                    current_colour = "red"
-                elif colour_code == YELLOW:
-                    current_colour = "yellow"
-                elif colour_code == GREEN:
-                    current_colour = "green"
-                elif colour_code == RESET:
-                    current_colour = None
-        
-    def flush(self):
-        pass
-        
-    def readline(self):
-        if self.input_callback:
-            return self.input_callback()
-        return "\n"
+                    args += [part, tags]
+    return args
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+class JobScheduler:
+    """
+    Runs the GUI's jobs one at a time, each in a background thread. A job started while another
+    is running is refused, as both would share the output panel.
+    The running job's progress is shown in a progress bar with an estimate of the time left,
+    and cancel() stops it at its next sheet or file.
+    """
+    def __init__(self, root, progress_bar, status_var, cancel_button, output):
+        self.root = root
+        self.progress_bar = progress_bar
+        self.status_var = status_var
+        self.cancel_button = cancel_button
+        self.output = output
+        self.progress = None
+        self.thread = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def start(self, name: str, job) -> bool:
+        """
+        Run job() in a background thread, unless a job is already running. Call from the Tk thread.
+        """
+        if self.running:
+            messagebox.showwarning("Busy", f"{self.progress.name} is still running. Wait for it to finish or cancel it first.")
+            return False
+
+        self.progress = JobProgress(name)
+        self.thread = threading.Thread(target=self._run, args=(self.progress, job), daemon=True)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.thread.start()
+        self._poll()
+        return True
+
+    def cancel(self):
+        if self.running:
+            self.progress.cancel()
+            self.status_var.set(f"Cancelling {self.progress.name}...")
+
+    def _run(self, progress: JobProgress, job):
+        cancelled = False
+        try:
+            with track_progress(progress):
+                job()
+        except RunCancelled:
+            cancelled = True
+            self.output.write(f"\n⏹ {progress.name.upper()} CANCELLED\n")
+        finally:
+            # After the job's output, on the Tk thread
+            self.output.call_soon(lambda: self._finished(progress, cancelled))
+
+    def _poll(self):
+        if not self.running:
+            return
+        self._show(self.progress)
+        self.root.after(PROGRESS_INTERVAL_MS, self._poll)
+
+    def _show(self, progress: JobProgress):
+        if progress.cancelled:
+            return
+
+        fraction = progress.fraction
+        if fraction is None:
+            # Nothing to count yet, e.g. while the sign in sheet is read
+            if str(self.progress_bar["mode"]) != "indeterminate":
+                self.progress_bar.config(mode="indeterminate")
+                self.progress_bar.start()
+            self.status_var.set(f"{progress.name}...")
+            return
+
+        if str(self.progress_bar["mode"]) != "determinate":
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate")
+        self.progress_bar["value"] = fraction * 100
+
+        status = f"{progress.name}: {progress.done} of {progress.total}"
+        if progress.item:
+            status += f" ({progress.item})"
+        eta = progress.eta_seconds()
+        if eta is not None:
+            status += f", about {format_duration(eta)} left"
+        self.status_var.set(status)
+
+    def _finished(self, progress: JobProgress, cancelled: bool):
+        self.thread = None
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate")
+        self.progress_bar["value"] = 0 if cancelled else 100
+        self.cancel_button.config(state=tk.DISABLED)
+
+        elapsed = format_duration(time.monotonic() - progress.start)
+        self.status_var.set(f"{progress.name} cancelled after {elapsed}" if cancelled else f"{progress.name} finished in {elapsed}")
+
 
 class TimesheetCheckerApp:
     def __init__(self, root):
@@ -129,8 +336,13 @@ class TimesheetCheckerApp:
         self.file_paths = {
             'folder_path': None,
             'amindefied_excel': None,
+            'timesheet_folder': None,
+            'season_folder': None,
             'sign_in_sheet': None
         }
+
+        # Parsed sign in sheets, kept for the whole session. Created on the first check
+        self.sign_in_cache = None
         
         self.setup_ui()
 
@@ -148,35 +360,15 @@ class TimesheetCheckerApp:
         title_frame = tk.Frame(self.root, bg=APP_BACKGROUND)
         title_frame.pack(pady=(10, 0))
 
-        # Try to load and display logo
-        try:
-            # Load logo
-            logo_path = self.resource_path("images/esc-logo.png")
-            if os.path.exists(logo_path):
-                logo = Image.open(logo_path)
-                # Resize logo
-                logo = logo.resize((48, 48), Image.Resampling.LANCZOS)
-                self.title_image = ImageTk.PhotoImage(logo)
-
-                # Image label
-                image_label = tk.Label(
-                    title_frame,
-                    image=self.title_image,
-                    bg=APP_BACKGROUND
-                )
-                image_label.pack(side=tk.LEFT, padx=(0, 15))
-        except Exception as e:
-            print(f"Could not load logo: {e}")
-
         # Title label
-        title_label = tk.Label(
+        self.title_label = tk.Label(
             title_frame, 
             text="Timesheet Checker", 
             font=("Segoe UI", 18, "bold"),
             bg=APP_BACKGROUND,
             fg=APP_TITLE,
         )
-        title_label.pack(side=tk.LEFT)
+        self.title_label.pack(side=tk.LEFT)
 
         # Add version label
         version_label = tk.Label(
@@ -213,8 +405,58 @@ class TimesheetCheckerApp:
         # Tab 3: Check Timesheets
         self.create_check_timesheets_tab()
         
-        # Output panel on right side
-        self.create_output_panel(right_frame)
+        # Output and results tabs on right side
+        self.output_notebook = ttk.Notebook(right_frame, style="Modern.TNotebook")
+        self.output_notebook.pack(expand=True, fill='both', padx=10, pady=20)
+
+        output_frame = tk.Frame(self.output_notebook, bg=FRAME_BACKGROUND)
+        self.output_notebook.add(output_frame, text="Output")
+        self.create_output_panel(output_frame)
+
+        self.results_table = ResultsTable(self.output_notebook, bg=FRAME_BACKGROUND)
+        self.output_notebook.add(self.results_table, text="Results")
+
+        # Progress of the running job, below the output
+        self.create_progress_panel(right_frame)
+
+    def after_window_shown(self):
+        """
+        Work left out of startup so the window appears quickly: the logo and the heavy imports.
+        """
+        self.load_logo()
+        threading.Thread(target=self.warm_up, daemon=True).start()
+
+    def load_logo(self):
+        # Try to load and display logo
+        try:
+            from PIL import Image, ImageTk
+
+            # Load logo
+            logo_path = self.resource_path("images/esc-logo.png")
+            if os.path.exists(logo_path):
+                logo = Image.open(logo_path)
+                # Resize logo
+                logo = logo.resize((48, 48), Image.Resampling.LANCZOS)
+                self.title_image = ImageTk.PhotoImage(logo)
+
+                # Image label, left of the title
+                image_label = tk.Label(
+                    self.title_label.master,
+                    image=self.title_image,
+                    bg=APP_BACKGROUND
+                )
+                image_label.pack(side=tk.LEFT, padx=(0, 15), before=self.title_label)
+        except Exception as e:
+            print(f"Could not load logo: {e}")
+
+    def warm_up(self):
+        # Import the checking modules so the first run does not wait for them.
+        # Failures are left for that run to report.
+        for module in WARM_UP_MODULES:
+            try:
+                importlib.import_module(module)
+            except Exception:
+                return
 
     def setup_modern_styles(self):
         # Configure modern ttk styles
@@ -260,11 +502,37 @@ class TimesheetCheckerApp:
         self.output_text.tag_configure("red", foreground=TEXT_RED)
         self.output_text.tag_configure("yellow", foreground=TEXT_YELLOW)
         self.output_text.tag_configure("green", foreground=TEXT_GREEN)
+
+        # Everything shown in the output area goes through here, from any thread
+        self.output = OutputChannel(self.output_text)
     
+    def create_progress_panel(self, parent):
+        # Packed before the output notebook so it keeps its space when the window is small
+        progress_frame = tk.Frame(parent, bg=FRAME_BACKGROUND)
+        progress_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=(0, 10), before=self.output_notebook)
+
+        progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=100)
+        progress_bar.pack(side=tk.LEFT, expand=True, fill=tk.X)
+
+        cancel_button = Button(
+            progress_frame,
+            text="Cancel",
+            command=lambda: self.jobs.cancel(),
+            state=tk.DISABLED,
+            highlightbackground=FRAME_BACKGROUND,
+            focusthickness=0,
+        )
+        cancel_button.pack(side=tk.RIGHT, padx=(10, 0))
+
+        status_var = tk.StringVar(value="Ready")
+        status_label = tk.Label(parent, textvariable=status_var, bg=FRAME_BACKGROUND, anchor="w")
+        status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=20, before=self.output_notebook)
+
+        # Runs checks and amindefy one at a time, reporting to the widgets above
+        self.jobs = JobScheduler(self.root, progress_bar, status_var, cancel_button, self.output)
+
     def clear_output(self):
-        self.output_text.config(state='normal')
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.config(state='disabled')
+        self.output.clear()
     
     def wait_for_enter(self):
         """Wait until the user presses Enter in the output terminal."""
@@ -296,10 +564,18 @@ class TimesheetCheckerApp:
         return "\n"
     
     def _write_to_output(self, text):
-        self.output_text.config(state='normal')
-        self.output_text.insert(tk.END, text)
-        self.output_text.see(tk.END)
-        self.output_text.config(state='disabled')
+        self.output.write(text)
+
+    def show_results(self, discrepancies_by_month: dict[str, list]):
+        """
+        Fill the results tab from a worker thread, switching to it if anything was found.
+        """
+        def update():
+            self.results_table.set_discrepancies(discrepancies_by_month)
+            if any(discrepancies_by_month.values()):
+                self.output_notebook.select(self.results_table)
+
+        self.output.call_soon(update)
     
     def create_amindefy_tab(self):
         frame = tk.Frame(self.notebook, bg=NOTEBOOK_TAB_BACKGROUND)
@@ -308,7 +584,7 @@ class TimesheetCheckerApp:
         # Instructions
         instructions = tk.Label(
             frame,
-            text="Combine all timesheets into a single Excel file.",
+            text="Combine all timesheets into a single Excel file, e.g. for archiving.",
             font=("Segoe UI", 12),
             bg=NOTEBOOK_TAB_BACKGROUND,
             wraplength=400
@@ -320,6 +596,16 @@ class TimesheetCheckerApp:
 
         # Output file selection
         self.create_output_file_input(frame, "Output Excel File", 'output_file', [('Excel files', '*.xlsx')])
+
+        # Only re-merge timesheets that changed since the last run into the same output file
+        self.incremental_var = tk.BooleanVar(value=False)
+        incremental_check = tk.Checkbutton(
+            frame,
+            text="Only update changed timesheets",
+            variable=self.incremental_var,
+            activeforeground=LABEL_FOREGROUND,
+        )
+        incremental_check.pack(padx=10, pady=5, anchor="w")
         
         # Process button
         process_btn = Button(
@@ -337,85 +623,52 @@ class TimesheetCheckerApp:
 
         instructions = tk.Label(
             frame,
-            text="Review and edit rates for each level. Remember to SAVE.",
+            text="Review and edit rates for each level. Add a rate change for each pay award "
+                 "during the season, with the date its rates apply from. Remember to SAVE.",
             font=("Segoe UI", 12),
             bg=NOTEBOOK_TAB_BACKGROUND,
             wraplength=400
         )
         instructions.pack(pady=20)
 
-        # Rate change checkbox and date (UI only)
-        self.rate_change_var = tk.BooleanVar(value=False)
-        self.rate_change_date_var = tk.StringVar(value="")
-
-        rate_change_frame = tk.Frame(frame)
-        rate_change_frame.pack(padx=10, pady=5, anchor="w")
-
-        rate_change_check = tk.Checkbutton(
-            rate_change_frame,
-            text="Rate change",
-            variable=self.rate_change_var,
-            command=self.toggle_rate_change,
-            activeforeground=LABEL_FOREGROUND,
+        add_change_btn = Button(
+            frame,
+            text="Add Rate Change",
+            command=self.add_rate_change_table,
+            highlightbackground=NOTEBOOK_TAB_BACKGROUND,
+            focusthickness=0,
         )
-        rate_change_check.pack(side=tk.LEFT, padx=(0, 10))
-
-        tk.Label(rate_change_frame, text="Change date (DD/MM/YYYY):").pack(side=tk.LEFT)
-        self.rate_change_date_entry = tk.Entry(rate_change_frame, textvariable=self.rate_change_date_var, state="disabled")
-        self.rate_change_date_entry.pack(side=tk.LEFT, padx=(5, 0))
-
-        # Load nested rates format (rates, rates_after, date)
-        rates, rates_after, rate_change_date = self.load_rates()
-        self.rates = rates
-        # if rates_after is None, keep internal copy for editing but hide the table UI
-        self.rates_after = {k: float(v) for k, v in rates.items()} if rates_after is None else {k: float(v) for k, v in rates_after.items()}
-
-        # set date UI if present
-        if rate_change_date:
-            self.rate_change_date_var.set(rate_change_date)
-            self.rate_change_var.set(True)
-            self.rate_change_date_entry.config(state='normal')
-        else:
-            self.rate_change_var.set(False)
-            self.rate_change_date_entry.config(state='disabled')
+        add_change_btn.pack(padx=10, pady=5, anchor="w")
+
+        # Load the rate timeline: base rates and any rate changes
+        timeline = self.load_rates()
+        self.rates = timeline.rates
 
         self.rate_vars = {}
-        self.rate_vars_after = {}
+        # One {frame, date_var, rate_vars} per rate change table, in the order shown
+        self.rate_changes = []
 
-        # Parent container holding two table frames side-by-side
-        tables_container = tk.Frame(frame)
-        tables_container.pack(padx=10, pady=10, fill=tk.X)
+        # Parent container holding the table frames side-by-side
+        self.tables_container = tk.Frame(frame)
+        self.tables_container.pack(padx=10, pady=10, fill=tk.X)
 
-        # Left table (current rates)
-        self.table_frame = tk.Frame(tables_container)
+        # Left table (base rates)
+        self.table_frame = tk.Frame(self.tables_container)
         self.table_frame.pack(side=tk.LEFT, padx=(0, 20))
 
-        tk.Label(self.table_frame, text="Level", font=("Arial", 11, "bold")).grid(row=0, column=0, padx=10, pady=5)
-        tk.Label(self.table_frame, text="Rate (£/hr)", font=("Arial", 11, "bold")).grid(row=0, column=1, padx=10, pady=5)
+        tk.Label(self.table_frame, text="Level", font=("Arial", 11, "bold")).grid(row=1, column=0, padx=10, pady=5)
+        tk.Label(self.table_frame, text="Rate (£/hr)", font=("Arial", 11, "bold")).grid(row=1, column=1, padx=10, pady=5)
 
-        for i, (level, rate) in enumerate(self.rates.items(), start=1):
+        for i, (level, rate) in enumerate(self.rates.items(), start=2):
             tk.Label(self.table_frame, text=level, font=("Arial", 11)).grid(row=i, column=0, padx=10, pady=5, sticky="w")
             var = tk.StringVar(value=f"{float(rate):.2f}")
             entry = tk.Entry(self.table_frame, textvariable=var, width=10, font=("Arial", 11))
             entry.grid(row=i, column=1, padx=10, pady=5)
             self.rate_vars[level] = var
 
-        # Right table (rates after change) — create but may be hidden depending on rates_after
-        self.table_frame_after = tk.Frame(tables_container)
-        tk.Label(self.table_frame_after, text="Level", font=("Arial", 11, "bold")).grid(row=0, column=0, padx=10, pady=5)
-        tk.Label(self.table_frame_after, text="Rate (£/hr) (after)", font=("Arial", 11, "bold")).grid(row=0, column=1, padx=10, pady=5)
-
-        for i, level in enumerate(self.rates.keys(), start=1):
-            tk.Label(self.table_frame_after, text=level, font=("Arial", 11)).grid(row=i, column=0, padx=10, pady=5, sticky="w")
-            after_value = self.rates_after.get(level, 0.0)
-            var_after = tk.StringVar(value=f"{float(after_value):.2f}")
-            entry_after = tk.Entry(self.table_frame_after, textvariable=var_after, width=10, font=("Arial", 11))
-            entry_after.grid(row=i, column=1, padx=10, pady=5)
-            self.rate_vars_after[level] = var_after
-
-        # Show after-table only if rates_after was present in file (not None) or checkbox is set
-        if rates_after is not None:
-            self.table_frame_after.pack(side=tk.LEFT)
+        # Rate change tables, to the right in date order
+        for change_date, rates in timeline.changes:
+            self.add_rate_change_table(change_date.strftime(RATE_CHANGE_DATE_FORMAT), rates)
 
         save_btn = Button(
             frame,
@@ -425,88 +678,80 @@ class TimesheetCheckerApp:
             focusthickness=0,
         )
         save_btn.pack(pady=10)
-    
-    def toggle_rate_change(self):
-        """Show/hide the after-table. If turning on and rates_after was None, copy current rates into it."""
-        if self.rate_change_var.get():
-            # ensure internal rates_after exists and populate from current rates if it was None
-            if getattr(self, "rates_after", None) is None:
-                self.rates_after = {k: float(v) for k, v in self.rates.items()}
-                # update UI entries to match
-                for lvl, var in self.rate_vars_after.items():
-                    var.set(f"{self.rates_after.get(lvl, 0.0):.2f}")
-            self.table_frame_after.pack(side=tk.LEFT, padx=(0, 0))
-            self.rate_change_date_entry.config(state='normal')
-        else:
-            # Hide it and mark internal as None (so save writes null)
-            self.table_frame_after.pack_forget()
-            self.rate_change_date_entry.config(state='disabled')
-            self.rates_after = None
-
-    def load_rates(self):
+
+    def add_rate_change_table(self, change_date: str = "", rates: dict[str, float] | None = None):
+        """Add a table of rates applying from change_date. A new one starts from the rightmost table's rates."""
+        if rates is None:
+            previous_vars = self.rate_changes[-1]["rate_vars"] if self.rate_changes else self.rate_vars
+            rates = {level: var.get() for level, var in previous_vars.items()}
+
+        table_frame = tk.Frame(self.tables_container)
+        table_frame.pack(side=tk.LEFT, padx=(0, 20))
+
+        date_var = tk.StringVar(value=change_date)
+        date_frame = tk.Frame(table_frame)
+        date_frame.grid(row=0, column=0, padx=10, pady=5)
+        tk.Label(date_frame, text="From (DD/MM/YYYY):").pack(side=tk.LEFT)
+        tk.Entry(date_frame, textvariable=date_var, width=11).pack(side=tk.LEFT, padx=(5, 0))
+
+        change = {"frame": table_frame, "date_var": date_var, "rate_vars": {}}
+        remove_btn = Button(
+            date_frame,
+            text="Remove",
+            command=lambda: self.remove_rate_change_table(change),
+            highlightbackground=NOTEBOOK_TAB_BACKGROUND,
+            focusthickness=0,
+        )
+        remove_btn.pack(side=tk.LEFT, padx=(5, 0))
+
+        # Levels are listed in the base table, so only the rates column is repeated
+        tk.Label(table_frame, text="Rate (£/hr)", font=("Arial", 11, "bold")).grid(row=1, column=0, padx=10, pady=5)
+        for i, level in enumerate(self.rates.keys(), start=2):
+            var = tk.StringVar(value=self._format_rate(rates.get(level, 0.0)))
+            entry = tk.Entry(table_frame, textvariable=var, width=10, font=("Arial", 11))
+            entry.grid(row=i, column=0, padx=10, pady=5)
+            change["rate_vars"][level] = var
+
+        self.rate_changes.append(change)
+
+    def remove_rate_change_table(self, change):
+        change["frame"].destroy()
+        self.rate_changes.remove(change)
+
+    @staticmethod
+    def _format_rate(rate) -> str:
+        try:
+            return f"{float(rate):.2f}"
+        except ValueError:
+            # Keep what was typed, so saving reports it
+            return str(rate)
+
+    def load_rates(self) -> RateTimeline:
         """
-        Load nested rates JSON:
-        { "rate_change_date": "DD/MM/YYYY" | null,
-            "rates": {...},
-            "rates_after": {...} | null
-        }
-        Returns (rates_dict, rates_after_dict_or_None, rate_change_date_or_None)
+        Load the rate timeline from the nested rates JSON:
+        { "rates": {...}, "rate_changes": [ { "date": "DD/MM/YYYY", "rates": {...} }, ... ] }
+        Files with a single rate_change_date and rates_after are read too.
         """
         try:
-            with open(RATES_FILE, "r") as f:
-                data = json.load(f)
-            if not isinstance(data, dict):
-                raise ValueError("rates.json must contain an object")
-            rates = {str(k): float(v) for k, v in data.get("rates", {}).items()}
-            rates_after_raw = data.get("rates_after", None)
-            rates_after = None if rates_after_raw is None else {str(k): float(v) for k, v in rates_after_raw.items()}
-            rate_change_date = data.get("rate_change_date", None)
-            # If file contained only a flat dict (older format), treat that as rates (back-compat)
-            if not rates:
-                # check if top-level keys look like rate levels (flat mapping)
-                flat_candidate = {str(k): float(v) for k, v in data.items() if k not in ("rates_after", "rate_change_date")}
-                if flat_candidate:
-                    return flat_candidate, None, None
-            return rates, rates_after, rate_change_date
+            return read_rate_timeline(RATES_FILE)
         except Exception:
-            return {level: 0.0 for level in RATE_LEVELS}, None, None
+            return RateTimeline({level: 0.0 for level in RATE_LEVELS})
 
-    def save_rates(self):
+    def save_rates(self, timeline: RateTimeline):
         """
-        Save nested structure:
-        { "rate_change_date": <str or null>, "rates": {...}, "rates_after": {...} or null }
-        If rate_change checkbox is unchecked, rates_after will be saved as null.
+        Save the nested rates JSON, with one entry in rate_changes per rate change table.
         """
         try:
-            # choose which rates_after to persist: either dict or None
-            rates_to_save = {k: float(v) for k, v in self.rates.items()}
-            if getattr(self, "rate_change_var", None) and self.rate_change_var.get() and getattr(self, "rates_after", None) is not None:
-                rates_after_to_save = {k: float(v) for k, v in self.rates_after.items()}
-            else:
-                rates_after_to_save = None
-
-            data = {
-                "rate_change_date": self.rate_change_date_var.get() if (getattr(self, "rate_change_var", None) and self.rate_change_var.get()) else None,
-                "rates": rates_to_save,
-                "rates_after": rates_after_to_save,
-            }
-
-            # Create intermediate directories if they don't exist
-            os.makedirs(os.path.dirname(RATES_FILE), exist_ok=True)
-
-            with open(RATES_FILE, "w") as f:
-                json.dump(data, f, indent=2)
-
+            write_rate_timeline(RATES_FILE, timeline)
             messagebox.showinfo("Saved", "Rates saved successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Could not save rates: {e}")
 
     def on_save_rates(self):
-        """Validate both tables and then persist nested JSON (rates + optional rates_after + date)."""
+        """Validate all tables and then persist the rate timeline."""
         new_rates = {}
-        new_rates_after = None
 
-        # Validate left table (current rates)
+        # Validate left table (base rates)
         for level, var in self.rate_vars.items():
             try:
                 value = float(var.get())
@@ -515,28 +760,32 @@ class TimesheetCheckerApp:
                 messagebox.showerror("Error", f"Invalid rate for {level}: {var.get()}")
                 return
 
-        # Validate right table only if visible (rate change checked)
-        if getattr(self, 'rate_change_var', None) and self.rate_change_var.get():
+        changes = []
+        for change in self.rate_changes:
+            change_date_text = change["date_var"].get().strip()
+            try:
+                change_date = parse_rate_change_date(change_date_text)
+            except ValueError:
+                messagebox.showerror("Error", f"Please enter a valid rate change date (DD/MM/YYYY), not '{change_date_text}'.")
+                return
 
-            if not self.rate_change_date_var.get():
-                messagebox.showerror("Error", "Please enter a valid rate change date (DD/MM/YYYY).")
+            if change_date in (other_date for other_date, _ in changes):
+                messagebox.showerror("Error", f"There are two rate changes on {change_date_text}.")
                 return
 
-            new_rates_after = {}
-            for level, var in self.rate_vars_after.items():
+            change_rates = {}
+            for level, var in change["rate_vars"].items():
                 try:
-                    value = float(var.get())
-                    new_rates_after[level] = value
+                    change_rates[level] = float(var.get())
                 except ValueError:
-                    messagebox.showerror("Error", f"Invalid rate for {level} (after change): {var.get()}")
+                    messagebox.showerror("Error", f"Invalid rate for {level} (from {change_date_text}): {var.get()}")
                     return
+            changes.append((change_date, change_rates))
 
         # assign to instance
         self.rates = new_rates
-        self.rates_after = new_rates_after
 
-        # Save nested structure (save_rates writes rates_after as null if None)
-        self.save_rates()
+        self.save_rates(RateTimeline(new_rates, changes))
 
     def create_check_timesheets_tab(self):
         frame = tk.Frame(self.notebook, bg=NOTEBOOK_TAB_BACKGROUND)
@@ -581,7 +830,18 @@ class TimesheetCheckerApp:
         
         # File input areas
         self.create_file_input(frame, "Timesheets Excel File", 'amindefied_excel', [('Excel files', '*.xls *.xlsx')])
+        self.create_folder_input(frame, "Or Timesheets Folder (no need to amindefy first)", 'timesheet_folder')
         self.create_file_input(frame, "Sign In Sheet", 'sign_in_sheet', [('Excel files', '*.xls *.xlsx')])
+
+        # Check misspelt timesheet names under the sign in name they clearly mean
+        self.remap_names_var = tk.BooleanVar(value=False)
+        remap_names_check = tk.Checkbutton(
+            frame,
+            text="Match misspelt names to the closest sign in name",
+            variable=self.remap_names_var,
+            activeforeground=LABEL_FOREGROUND,
+        )
+        remap_names_check.pack(padx=10, pady=5, anchor="w")
         
         # Process button
         process_btn = Button(
@@ -591,7 +851,19 @@ class TimesheetCheckerApp:
             highlightbackground=NOTEBOOK_TAB_BACKGROUND,
             focusthickness=0,
         )
-        process_btn.pack(pady=30)
+        process_btn.pack(pady=(30, 10))
+
+        # Whole season: one workbook or folder per month, named after the month
+        self.create_folder_input(frame, "Season Folder (e.g. September.xlsx, October.xlsx or month folders)", 'season_folder')
+
+        season_btn = Button(
+            frame,
+            text="Check Whole Season",
+            command=self.run_check_season,
+            highlightbackground=NOTEBOOK_TAB_BACKGROUND,
+            focusthickness=0,
+        )
+        season_btn.pack(pady=(10, 30))
     
     def create_folder_input(self, parent, label_text, key):
         # Container frame
@@ -708,6 +980,14 @@ class TimesheetCheckerApp:
         self.file_paths[key] = path
         path_var = getattr(self, f'{key}_var')
         path_var.set(f"Selected: {os.path.basename(path)}")
+
+        if key in TIMESHEET_INPUTS:
+            # Only one source of timesheets at a time, so clear the other one
+            for other_key in TIMESHEET_INPUTS:
+                if other_key != key and self.file_paths[other_key]:
+                    self.file_paths[other_key] = None
+                    getattr(self, f'{other_key}_var').set(f"Cleared: the {TIMESHEET_INPUTS[key]} is checked instead")
+            path_var.set(f"Selected: {os.path.basename(path)} (this {TIMESHEET_INPUTS[key]} will be checked)")
     
     def run_amindefy(self):
         if not self.file_paths['folder_path']:
@@ -716,49 +996,116 @@ class TimesheetCheckerApp:
         
         def process():
             try:
+                from amindefy import amindefy_timesheets
+                from timing import collect_timings, profile_from_environment
+
                 self.clear_output()
                 
-                with OutputCapture(self.output_text, self.get_user_input):
+                with self.output.capture(self.get_user_input), profile_from_environment("amindefy"), collect_timings() as timer:
                     print("Processing folder...")
                     print(f"Folder: {self.file_paths['folder_path']}")
-                    amindefy_timesheets(self.file_paths['folder_path'], self.file_paths.get('output_file', 'all_timesheets.xlsx'))
+                    amindefy_timesheets(
+                        self.file_paths['folder_path'],
+                        self.file_paths.get('output_file', 'all_timesheets.xlsx'),
+                        workers=os.cpu_count() or 1,
+                        incremental=self.incremental_var.get(),
+                    )
+                    print(f"\n{timer.summary()}")
                 
                 self._write_to_output(f"\n✅ TIMESHEETS PROCESSED SUCCESSFULLY!\n")
             except Exception as e:
                 self._write_to_output(f"\n❌ ERROR: {str(e)}\n")
         
         # Run in separate thread to prevent GUI freezing
-        threading.Thread(target=process, daemon=True).start()
+        self.jobs.start("Amindefy", process)
     
     def run_check_timesheets(self):
-        if not self.file_paths['amindefied_excel'] or not self.file_paths['sign_in_sheet']:
-            messagebox.showerror("Error", "Please select both Excel files")
+        if not (self.file_paths['amindefied_excel'] or self.file_paths['timesheet_folder']) or not self.file_paths['sign_in_sheet']:
+            messagebox.showerror("Error", "Please select the timesheets (Excel file or folder) and the sign in sheet")
             return
 
         def process():
             try:
+                from check_timesheets import check_timesheets, check_timesheet_folder
+                from read_sign_in import SignInCache
+                from timing import collect_timings, profile_from_environment
+
+                if self.sign_in_cache is None:
+                    self.sign_in_cache = SignInCache(SIGN_IN_CACHE_DIR)
+
                 self.clear_output()
-                with OutputCapture(self.output_text, self.get_user_input):
-                    # load nested rates triple and pass all three to check_timesheets
-                    rates, rates_after, rate_change_date = self.load_rates()
-                    check_timesheets(
-                        self.file_paths['amindefied_excel'],
+                with self.output.capture(self.get_user_input), profile_from_environment("check"), collect_timings() as timer:
+                    # load the rate timeline, which check_timesheets takes in place of the rates
+                    timeline = self.load_rates()
+                    # A selected folder is checked directly, without the combined workbook
+                    if self.file_paths['timesheet_folder']:
+                        check = check_timesheet_folder
+                        timesheets_path = self.file_paths['timesheet_folder']
+                    else:
+                        check = check_timesheets
+                        timesheets_path = self.file_paths['amindefied_excel']
+                    discrepancies = check(
+                        timesheets_path,
                         self.file_paths['sign_in_sheet'],
-                        rates,
-                        rates_after,
-                        rate_change_date,
-                        self.month
+                        timeline,
+                        None,
+                        None,
+                        self.month,
+                        workers=os.cpu_count() or 1,
+                        reader="openpyxl",
+                        cache_dir=TIMESHEET_CACHE_DIR,
+                        sign_in_cache=self.sign_in_cache,
+                        remap_names=self.remap_names_var.get(),
                     )
+                    self.show_results({self.month: discrepancies})
+                    print(f"\n{timer.summary()}")
                 self._write_to_output(f"\n✅ TIMESHEET CHECK COMPLETED!\n")
             except Exception as e:
                 self._write_to_output(f"\n❌ ERROR: {str(e)}\n")
 
-        threading.Thread(target=process, daemon=True).start()
+        self.jobs.start("Timesheet check", process)
+
+    def run_check_season(self):
+        if not self.file_paths['season_folder'] or not self.file_paths['sign_in_sheet']:
+            messagebox.showerror("Error", "Please select the season folder and the sign in sheet")
+            return
+
+        def process():
+            try:
+                from check_season import check_season, find_season_timesheets
+                from timing import collect_timings, profile_from_environment
+
+                self.clear_output()
+                with self.output.capture(self.get_user_input), profile_from_environment("season"), collect_timings() as timer:
+                    timeline = self.load_rates()
+                    timesheets_by_month = find_season_timesheets(self.file_paths['season_folder'], MONTHS)
+                    if not timesheets_by_month:
+                        raise ValueError("No timesheets named after a month were found in the season folder")
+                    discrepancies_by_month = check_season(
+                        timesheets_by_month,
+                        self.file_paths['sign_in_sheet'],
+                        timeline,
+                        None,
+                        None,
+                        workers=os.cpu_count() or 1,
+                        reader="openpyxl",
+                        cache_dir=TIMESHEET_CACHE_DIR,
+                        remap_names=self.remap_names_var.get(),
+                    )
+                    self.show_results(discrepancies_by_month)
+                    print(f"\n{timer.summary()}")
+                self._write_to_output("\n✅ SEASON CHECK COMPLETED!\n")
+            except Exception as e:
+                self._write_to_output(f"\n❌ ERROR: {str(e)}\n")
+
+        self.jobs.start("Season check", process)
 
 
 def main():
     root = tk.Tk()
     app = TimesheetCheckerApp(root)
+    # Idle callbacks run in order, so this comes after Tk has mapped the window
+    root.after_idle(app.after_window_shown)
     root.mainloop()
 
 if __name__ == "__main__":
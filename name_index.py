@@ -0,0 +1,96 @@
+"""
+Fuzzy lookup of sign in sheet names, for suggesting the intended name of a misspelt timesheet.
+"""
+from collections import defaultdict
+
+# Suggestions less similar than this are left out
+MIN_SIMILARITY = 0.3
+
+# A timesheet name is only re-mapped automatically to a name at least this similar,
+# and clearly closer than the next best one
+REMAP_SIMILARITY = 0.75
+REMAP_MARGIN = 0.15
+
+# Separators become spaces, other punctuation is dropped
+_PUNCTUATION = str.maketrans({",": " ", "-": " ", "'": None, ".": None})
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lower case name with single spaces, no punctuation and its words sorted,
+    so "LAST,  First" and "first last", or "Mary-Ann O'Neil" and "mary ann oneil" are equal.
+    """
+    name = name.translate(_PUNCTUATION).lower()
+    return " ".join(sorted(name.split()))
+
+
+def trigrams(text: str) -> set[str]:
+    # Padded so short names and word boundaries still count
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Trigram index over a fixed set of names. Build it once per run and query it for each unknown name.
+    """
+    def __init__(self, names):
+        self.names = list(names)
+        self.normalized = {}
+        self.name_trigrams = []
+        self.postings = defaultdict(list)
+
+        for i, name in enumerate(self.names):
+            normalized = normalize_name(name)
+            self.normalized.setdefault(normalized, name)
+            grams = trigrams(normalized)
+            self.name_trigrams.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(i)
+
+    def suggest(self, name: str, k: int = 3) -> list[tuple[str, float]]:
+        """
+        Up to k (name, similarity) pairs of the closest names, best first.
+        Similarity is 1 for names only differing in case, spacing or word order.
+        """
+        normalized = normalize_name(name)
+        exact = self.normalized.get(normalized)
+
+        # Dice coefficient over shared trigrams
+        grams = trigrams(normalized)
+        shared = defaultdict(int)
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] += 1
+
+        scored = []
+        for i, count in shared.items():
+            if self.names[i] == exact:
+                continue
+            similarity = 2 * count / (len(grams) + self.name_trigrams[i])
+            if similarity >= MIN_SIMILARITY:
+                scored.append((self.names[i], similarity))
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+
+        if exact is not None:
+            scored.insert(0, (exact, 1.0))
+        return scored[:k]
+
+    def best_match(self, name: str) -> str | None:
+        """
+        The name a timesheet name almost certainly means, or None if it is not clear enough.
+        """
+        # Only differing in case, spacing, word order or punctuation
+        exact = self.normalized.get(normalize_name(name))
+        if exact is not None:
+            return exact
+
+        suggestions = self.suggest(name, k=2)
+        if not suggestions:
+            return None
+
+        best_name, best_similarity = suggestions[0]
+        next_similarity = suggestions[1][1] if len(suggestions) > 1 else 0.0
+        if best_similarity >= REMAP_SIMILARITY and best_similarity - next_similarity >= REMAP_MARGIN:
+            return best_name
+        return None
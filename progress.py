@@ -0,0 +1,139 @@
+"""
+Progress reporting and cooperative cancellation for long runs.
+
+Checks and amindefy report their items (sheets or files) with progress_total and progress_step,
+which do nothing unless a JobProgress is tracked in the current thread:
+
+    with track_progress(job):
+        check_timesheets(...)
+
+progress_step raises RunCancelled once the job is cancelled, so a run stops between two items.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+_current_progress = contextvars.ContextVar("current_progress", default=None)
+_counting = contextvars.ContextVar("counting", default=True)
+
+
+class RunCancelled(BaseException):
+    """
+    Raised in a run once its job is cancelled. Like KeyboardInterrupt it is not an Exception,
+    so the run's error handling does not catch it on the way out.
+    """
+
+
+class JobProgress:
+    """
+    How many items of a job are done out of how many are known, safe to read from other threads.
+    The total can grow while the job runs, e.g. as each month of a season is started.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0
+        self.done = 0
+        self.item = None
+        self.start = time.monotonic()
+        self._cancelled = threading.Event()
+
+    def add_total(self, count: int):
+        self.total += count
+
+    def step(self, item: str | None = None):
+        self.check_cancelled()
+        self.done += 1
+        self.item = item
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise RunCancelled(self.name)
+
+    @property
+    def fraction(self) -> float | None:
+        # None until the total is known
+        return min(1.0, self.done / self.total) if self.total else None
+
+    def eta_seconds(self) -> float | None:
+        """
+        Time left at the average pace so far, or None before the first item is done.
+        """
+        if not self.done or not self.total:
+            return None
+        elapsed = time.monotonic() - self.start
+        return max(0.0, elapsed / self.done * (self.total - self.done))
+
+
+@contextlib.contextmanager
+def track_progress(progress: JobProgress):
+    """
+    Report the items of the code run inside to progress, in this thread.
+    """
+    token = _current_progress.set(progress)
+    try:
+        yield progress
+    finally:
+        _current_progress.reset(token)
+
+
+@contextlib.contextmanager
+def uncounted():
+    """
+    Inside, items are not counted, e.g. the sheets of a season check that counts months instead.
+    Cancellation still stops the run at each item.
+    """
+    token = _counting.set(False)
+    try:
+        yield
+    finally:
+        _counting.reset(token)
+
+
+def progress_total(count: int):
+    """
+    Announce count more items to be done.
+    """
+    progress = _current_progress.get()
+    if progress is not None and _counting.get():
+        progress.add_total(count)
+
+
+def progress_step(item: str | None = None):
+    """
+    Mark an item done, or stop with RunCancelled if the job is cancelled.
+    """
+    progress = _current_progress.get()
+    if progress is None:
+        return
+    if _counting.get():
+        progress.step(item)
+    else:
+        progress.check_cancelled()
+
+
+def cancellable_map(func, *iterables, workers: int):
+    """
+    Like map, but in worker processes when there is more than one worker. Results come in order.
+    Items are sent to the workers in chunks sized from the first iterable with a length.
+    """
+    if workers <= 1:
+        yield from map(func, *iterables)
+        return
+
+    count = next((len(iterable) for iterable in iterables if hasattr(iterable, "__len__")), 0)
+    chunksize = max(1, count // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            yield from executor.map(func, *iterables, chunksize=chunksize)
+        finally:
+            # When stopped early, e.g. by a cancelled run, only wait for the items already started
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,119 @@
+import json
+import os
+import platform
+from bisect import bisect_right
+from datetime import date, datetime
+
+RATE_LEVELS = [
+    "L1", "L2", "NQL2", "Enhanced L2", "Lower Enhanced L2",
+    "Safeguarding", "Admin", "Gala Full Day", "Gala Half Day"
+]
+
+# Get different path depending on Windows vs Mac vs Linux
+def get_rates_file_path():
+    system = platform.system()
+    if system == "Windows":
+        return os.path.join(os.path.expanduser("~"), "AppData", "Local", "AutoTimesheetChecker", "rates.json")
+    elif system == "Darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "AutoTimesheetChecker", "rates.json")
+    elif system == "Linux":
+        config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        return os.path.join(config_home, "AutoTimesheetChecker", "rates.json")
+    else:
+        raise NotImplementedError(f"Unsupported OS: {system}")
+
+
+RATE_CHANGE_DATE_FORMAT = "%d/%m/%Y"
+
+
+class RateTimeline:
+    """
+    Level -> rate tables over a season: the base rates, then rate changes that each apply
+    from their date until the next change.
+    """
+    def __init__(self, rates: dict[str, float], changes: list[tuple[date, dict[str, float]]] | None = None):
+        self.rates = rates
+        self.changes = sorted(changes or [], key=lambda change: change[0])
+        self.change_dates = [change_date for change_date, _ in self.changes]
+
+    @classmethod
+    def from_rates(cls, rates, rates_after: dict[str, float] | None = None, rate_change_date: str | None = None) -> "RateTimeline":
+        """
+        Timeline from the older rates, rates_after and rate_change_date arguments.
+        rates may already be a RateTimeline, which is returned as is.
+        """
+        if isinstance(rates, RateTimeline):
+            return rates
+        if rate_change_date and rates_after:
+            return cls(rates, [(parse_rate_change_date(rate_change_date), rates_after)])
+        return cls(rates)
+
+    def tables(self) -> list[dict[str, float]]:
+        """
+        All rate tables in date order. table_index gives the position of the one used on a day.
+        """
+        return [self.rates] + [rates for _, rates in self.changes]
+
+    def table_index(self, day: date) -> int:
+        return bisect_right(self.change_dates, day)
+
+    def to_json(self) -> dict:
+        return {
+            "rates": self.rates,
+            "rate_changes": [
+                {"date": change_date.strftime(RATE_CHANGE_DATE_FORMAT), "rates": rates}
+                for change_date, rates in self.changes
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data) -> "RateTimeline":
+        """
+        Read the nested rates JSON. Also accepts the older single rate change format:
+        { "rate_change_date": "DD/MM/YYYY" | null, "rates": {...}, "rates_after": {...} | null }
+        and the oldest flat level -> rate object.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("rates.json must contain an object")
+
+        rates = _rate_table(data.get("rates", {}))
+        # If file contained only a flat dict (older format), treat that as rates (back-compat)
+        if not rates:
+            # check if top-level keys look like rate levels (flat mapping)
+            flat_candidate = {k: v for k, v in data.items() if k not in ("rates_after", "rate_change_date", "rate_changes")}
+            if flat_candidate:
+                return cls(_rate_table(flat_candidate))
+
+        if "rate_changes" in data:
+            changes = [(parse_rate_change_date(change["date"]), _rate_table(change["rates"])) for change in data["rate_changes"]]
+            return cls(rates, changes)
+
+        rates_after = data.get("rates_after", None)
+        return cls.from_rates(rates, None if rates_after is None else _rate_table(rates_after), data.get("rate_change_date", None))
+
+
+def parse_rate_change_date(rate_change_date: str) -> date:
+    try:
+        return datetime.strptime(rate_change_date, RATE_CHANGE_DATE_FORMAT).date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Rate change date {rate_change_date} is in invalid format. It must be in DD/MM/YYYY format.")
+
+
+def _rate_table(rates: dict) -> dict[str, float]:
+    return {str(k): float(v) for k, v in rates.items()}
+
+
+def read_rate_timeline(file_path: str) -> RateTimeline:
+    """
+    Load the rates JSON file. Raises OSError or ValueError if it is missing or malformed.
+    """
+    with open(file_path, "r") as f:
+        return RateTimeline.from_json(json.load(f))
+
+
+def write_rate_timeline(file_path: str, timeline: RateTimeline):
+    # Create intermediate directories if they don't exist
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    with open(file_path, "w") as f:
+        json.dump(timeline.to_json(), f, indent=2)
@@ -1,47 +1,129 @@
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 from entry import Entry
 from collections import defaultdict
+from timesheet_cache import DiskCache, encode_entries, decode_entries, file_digest
+from rates import RateTimeline
 
 NAME_COL = "Name"
 LEVEL_COL = "Level"
 
-def read_sign_in_sheet(month: str, file_path: str, rates: dict[str, float], rates_after: dict[str, float] | None, rate_change_date: str | None) -> dict[str, set[Entry]]:
+def read_sign_in_sheet(month: str, file_path: str, rates: dict[str, float], rates_after: dict[str, float] | None, rate_change_date: str | None) -> dict[str, list[Entry]]:
     """
-    Read a sign in sheet excel file and return a dictionnary from name to set of entries
+    Read a sign in sheet excel file and return a dictionnary from name to list of entries.
+    Identical sessions are kept as separate entries
     """
     sign_df = pd.read_excel(file_path, month, header=0)
 
-    sign_in_sheet_data = defaultdict(set)
-
-    for _, row in sign_df.iterrows():
-        # Skip rows below the table and LHC rows
-        if pd.isna(row[LEVEL_COL]) or row[LEVEL_COL] == "LHC":
-            continue
-
-        name = row[NAME_COL].strip()
-
-        for col in sign_df.columns[3:]:
-            # Skip empty cells
-            if pd.isna(row[col]):
-                continue
-                
-            # Determine which rate to use based on the date and rate change date
-            if rate_change_date and rates_after:
-                try:
-                    if col.date() >= pd.to_datetime(rate_change_date, format="%d/%m/%Y").date():
-                        rate = rates_after[row[LEVEL_COL]]
-                    else:
-                        rate = rates[row[LEVEL_COL]]
-                except ValueError:
-                    raise ValueError(f"Rate change date {rate_change_date} is in invalid format. It must be in DD/MM/YYYY format.")
-            else:
-                rate = rates[row[LEVEL_COL]]
-
-            entry = Entry(
-                date=col.date(),
-                hours=float(row[col]),
-                rate=rate,
-            )
-            sign_in_sheet_data[name].add(entry)
-
-    return sign_in_sheet_data
\ No newline at end of file
+    return sign_in_entries(sign_df, rates, rates_after, rate_change_date)
+
+
+def read_sign_in_workbook(file_path: str, months: list[str], rates: dict[str, float], rates_after: dict[str, float] | None, rate_change_date: str | None) -> dict[str, dict[str, list[Entry]]]:
+    """
+    Read several months of a sign in sheet excel file, opening the workbook only once.
+    Returns a dictionnary from month to the data read_sign_in_sheet would return for it.
+    """
+    sign_dfs = pd.read_excel(file_path, list(months), header=0)
+
+    return {month: sign_in_entries(sign_dfs[month], rates, rates_after, rate_change_date) for month in months}
+
+
+def sign_in_entries(sign_df: pd.DataFrame, rates: dict[str, float], rates_after: dict[str, float] | None, rate_change_date: str | None) -> dict[str, list[Entry]]:
+    """
+    Build the sign in data from an already loaded month sheet.
+    Works on whole columns at once instead of walking the sheet cell by cell.
+    rates may also be a RateTimeline, with rates_after and rate_change_date left as None.
+    """
+    sign_in_sheet_data = defaultdict(list)
+
+    # Skip rows below the table and LHC rows
+    levels = sign_df[LEVEL_COL]
+    coach_df = sign_df[levels.notna() & (levels != "LHC")]
+
+    date_cols = sign_df.columns[3:]
+    if coach_df.empty or len(date_cols) == 0:
+        return sign_in_sheet_data
+
+    names = [name.strip() for name in coach_df[NAME_COL]]
+    coach_levels = coach_df[LEVEL_COL].tolist()
+
+    # Positions of all non-empty cells, in the same row-major order as the sheet
+    values = coach_df[date_cols].to_numpy(dtype=object)
+    row_idx, col_idx = np.nonzero(pd.notna(values))
+    if len(row_idx) == 0:
+        return sign_in_sheet_data
+
+    hours = [float(value) for value in values[row_idx, col_idx]]
+
+    # Resolve the date and rate table of each used column once
+    timeline = RateTimeline.from_rates(rates, rates_after, rate_change_date)
+    col_dates = {}
+    col_tables = np.zeros(len(date_cols), dtype=np.intp)
+    for c in np.unique(col_idx).tolist():
+        col_dates[c] = date_cols[c].date()
+        col_tables[c] = timeline.table_index(col_dates[c])
+
+    # Rate of each coach row under each rate table, NaN where a table has no rate for the level
+    tables = timeline.tables()
+    level_rates = np.array([[table.get(level, np.nan) for level in coach_levels] for table in tables], dtype=float)
+
+    # A single array index per cell
+    cell_rates = level_rates[col_tables[col_idx], row_idx]
+    missing = np.flatnonzero(np.isnan(cell_rates))
+    if len(missing):
+        raise KeyError(coach_levels[row_idx[missing[0]]])
+
+    for r, c, h, rate in zip(row_idx.tolist(), col_idx.tolist(), hours, cell_rates.tolist()):
+        entry = Entry(
+            date=col_dates[c],
+            hours=h,
+            rate=rate,
+        )
+        sign_in_sheet_data[names[r]].append(entry)
+
+    return sign_in_sheet_data
+
+
+class SignInCache:
+    """
+    Remembers parsed sign in data per sign in file contents, month and rates.
+    Kept in memory for the lifetime of the object and, with a cache_dir, on disk between runs.
+    Every read returns newly built lists, as checking removes matched entries from them.
+    """
+    def __init__(self, cache_dir: str | None = None):
+        self.memory = {}
+        self.disk = DiskCache(cache_dir) if cache_dir else None
+
+    def read(self, month: str, file_path: str, rates: dict[str, float], rates_after: dict[str, float] | None, rate_change_date: str | None) -> dict[str, list[Entry]]:
+        """
+        Same as read_sign_in_sheet, but only reads the sheet if it is not cached yet.
+        """
+        key = sign_in_key(month, file_digest(file_path), rates, rates_after, rate_change_date)
+
+        stored = self.memory.get(key)
+        if stored is None and self.disk is not None:
+            try:
+                stored = self.disk.load(key)
+            except KeyError:
+                pass
+
+        if stored is None:
+            sign_in_data = read_sign_in_sheet(month, file_path, rates, rates_after, rate_change_date)
+            stored = {name: encode_entries(entries) for name, entries in sign_in_data.items()}
+            if self.disk is not None:
+                self.disk.store(key, stored)
+                self.disk.evict()
+
+        self.memory[key] = stored
+
+        sign_in_data = defaultdict(list)
+        for name, rows in stored.items():
+            sign_in_data[name] = decode_entries(rows)
+        return sign_in_data
+
+
+def sign_in_key(month: str, file_digest: str, rates: dict[str, float], rates_after: dict[str, float] | None, rate_change_date: str | None) -> str:
+    rates_fingerprint = json.dumps(RateTimeline.from_rates(rates, rates_after, rate_change_date).to_json(), sort_keys=True)
+    return hashlib.sha256(f"sign-in-2:{month}:{file_digest}:{rates_fingerprint}".encode()).hexdigest()
@@ -0,0 +1,266 @@
+"""
+Results tab of the GUI: the discrepancies of the last check as a sortable, filterable table.
+"""
+import numbers
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from discrepancies.export import open_discrepancy_writer
+
+COLUMNS = ("month", "type", "coach", "date", "hours", "rate", "details")
+HEADINGS = {
+    "month": "Month",
+    "type": "Type",
+    "coach": "Coach",
+    "date": "Date",
+    "hours": "Hours",
+    "rate": "Rate",
+    "details": "Details",
+}
+COLUMN_WIDTHS = {"month": 80, "type": 150, "coach": 150, "date": 90, "hours": 55, "rate": 55, "details": 200}
+
+# Label of each Discrepancy.to_dict() type
+TYPE_LABELS = {
+    "timesheet_extra_entry": "Extra in timesheet",
+    "sign_in_extra_entry": "Extra in sign in sheet",
+    "invalid_name": "Invalid name",
+    "remapped_name": "Remapped name",
+    "empty_timesheet": "Empty timesheet",
+    "hours_mismatch": "Hours mismatch",
+    "rate_mismatch": "Rate mismatch",
+}
+ALL_TYPES = "All types"
+
+ROW_HEIGHT = 22
+
+
+def discrepancy_row(month: str, discrepancy) -> tuple:
+    """
+    Table row of a discrepancy, in COLUMNS order. Missing values are None.
+    """
+    record = discrepancy.to_record(month)
+    kind = record["type"]
+    coach = record["coach"] or record["sheet"] or ""
+    details = ""
+    if kind == "invalid_name":
+        suggestions = record["suggestions"]
+        details = f"Did you mean: {suggestions.replace('; ', ', ')}?" if suggestions else "Not in the sign in sheet"
+    elif kind == "remapped_name":
+        details = f"Checked as {record['sign_in_name']}"
+    elif kind == "hours_mismatch":
+        details = f"{record['sign_in_hours']} hours in sign in sheet"
+    elif kind == "rate_mismatch":
+        details = f"{record['sign_in_rate']}/hour in sign in sheet"
+
+    if record["count"] > 1:
+        details = f"{details}, {record['count']} times" if details else f"{record['count']} times"
+
+    return (month, TYPE_LABELS.get(kind, kind), coach, record["date"], record["hours"], record["rate"], details)
+
+
+def sort_rank(value) -> int:
+    """
+    Which group a value is sorted in: 0 for numbers, 1 for text and anything else, 2 for missing
+    values (None or NaN). Values of different groups cannot be compared, so each group is sorted on its own.
+    """
+    # NaN is the only value not equal to itself
+    if value is None or value != value:
+        return 2
+    if isinstance(value, numbers.Real):
+        return 0
+    return 1
+
+
+class ResultsTable(tk.Frame):
+    """
+    Discrepancies in a Treeview that only ever holds the rows that fit on screen.
+    Scrolling, sorting and filtering refill those rows from the list in memory.
+    """
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        # All rows with their (month, discrepancy), and the indices of those passing the filters in display order
+        self.rows = []
+        self.discrepancies = []
+        self.shown = []
+        self.offset = 0
+        self.page_size = 1
+        self.sort_column = None
+        self.sort_descending = False
+
+        # Filters
+        filter_frame = tk.Frame(self)
+        filter_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.coach_var = tk.StringVar()
+        self.type_var = tk.StringVar(value=ALL_TYPES)
+        self.date_var = tk.StringVar()
+
+        tk.Label(filter_frame, text="Coach:").pack(side=tk.LEFT)
+        tk.Entry(filter_frame, textvariable=self.coach_var, width=15).pack(side=tk.LEFT, padx=(0, 10))
+        tk.Label(filter_frame, text="Type:").pack(side=tk.LEFT)
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.type_var,
+            values=[ALL_TYPES] + list(TYPE_LABELS.values()),
+            state="readonly",
+            width=20,
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        tk.Label(filter_frame, text="Date:").pack(side=tk.LEFT)
+        tk.Entry(filter_frame, textvariable=self.date_var, width=11).pack(side=tk.LEFT, padx=(0, 10))
+
+        tk.Button(filter_frame, text="Export...", command=self.export).pack(side=tk.RIGHT, padx=(10, 0))
+
+        self.count_var = tk.StringVar()
+        tk.Label(filter_frame, textvariable=self.count_var).pack(side=tk.RIGHT)
+
+        for var in (self.coach_var, self.type_var, self.date_var):
+            var.trace_add("write", lambda *args: self.refresh())
+
+        # Table
+        table_frame = tk.Frame(self)
+        table_frame.pack(expand=True, fill=tk.BOTH)
+
+        ttk.Style().configure("Results.Treeview", rowheight=ROW_HEIGHT)
+        self.tree = ttk.Treeview(table_frame, columns=COLUMNS, show="headings", style="Results.Treeview", selectmode="browse")
+        for column in COLUMNS:
+            self.tree.heading(column, text=HEADINGS[column], command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=COLUMN_WIDTHS[column], stretch=column == "details")
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+
+        self.refresh()
+
+    def set_discrepancies(self, discrepancies_by_month: dict[str, list]):
+        self.discrepancies = [
+            (month, discrepancy)
+            for month, discrepancies in discrepancies_by_month.items()
+            for discrepancy in discrepancies
+        ]
+        self.rows = [discrepancy_row(month, discrepancy) for month, discrepancy in self.discrepancies]
+        self.refresh()
+
+    def export(self):
+        """
+        Save the discrepancies passing the filters, in display order, as CSV, JSON lines or Excel.
+        """
+        if not self.shown:
+            messagebox.showinfo("Export", "There are no discrepancies to export.")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            title="Export discrepancies",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON lines", "*.jsonl"), ("Excel files", "*.xlsx")],
+        )
+        if not filename:
+            return
+
+        try:
+            with open_discrepancy_writer(filename) as writer:
+                for i in self.shown:
+                    month, discrepancy = self.discrepancies[i]
+                    writer.write(discrepancy, month)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export discrepancies: {e}")
+            return
+        messagebox.showinfo("Export", f"Exported {writer.count} discrepancies to {os.path.basename(filename)}")
+
+    def sort_by(self, column: str):
+        # Clicking the same heading again reverses the order
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+
+        for c in COLUMNS:
+            arrow = (" ▼" if self.sort_descending else " ▲") if c == column else ""
+            self.tree.heading(c, text=HEADINGS[c] + arrow)
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        Apply the filters and sort order, and show the first page.
+        """
+        coach = self.coach_var.get().strip().lower()
+        type_label = self.type_var.get()
+        date = self.date_var.get().strip()
+
+        coach_i, type_i, date_i = COLUMNS.index("coach"), COLUMNS.index("type"), COLUMNS.index("date")
+        shown = [
+            i for i, row in enumerate(self.rows)
+            if (not coach or coach in row[coach_i].lower())
+            and (type_label == ALL_TYPES or row[type_i] == type_label)
+            # Dates are ISO, so a prefix like 2025-10 selects a month
+            and (not date or (row[date_i] or "").startswith(date))
+        ]
+
+        if self.sort_column is not None:
+            column_i = COLUMNS.index(self.sort_column)
+            # Numbers, then text, then empty values, whatever the direction
+            groups = ([], [], [])
+            for i in shown:
+                groups[sort_rank(self.rows[i][column_i])].append(i)
+            numbers_shown, text_shown, missing = groups
+            numbers_shown.sort(key=lambda i: self.rows[i][column_i], reverse=self.sort_descending)
+            text_shown.sort(key=lambda i: str(self.rows[i][column_i]), reverse=self.sort_descending)
+            shown = numbers_shown + text_shown + missing
+
+        self.shown = shown
+        self.offset = 0
+        self.count_var.set(f"{len(shown)} of {len(self.rows)} discrepancies")
+        self._render()
+
+    def scroll(self, rows: int):
+        self.offset = max(0, min(self.offset + rows, len(self.shown) - self.page_size))
+        self._render()
+
+    def _render(self):
+        page = self.shown[self.offset:self.offset + self.page_size]
+        items = self.tree.get_children()
+
+        # Reuse the existing items, only their values change
+        for i, row_i in enumerate(page):
+            values = ["" if value is None else value for value in self.rows[row_i]]
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", tk.END, values=values)
+        if len(items) > len(page):
+            self.tree.delete(*items[len(page):])
+
+        if self.shown:
+            self.scrollbar.set(self.offset / len(self.shown), (self.offset + len(page)) / len(self.shown))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_resize(self, event):
+        # One row is taken by the headings
+        page_size = max(1, event.height // ROW_HEIGHT - 1)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.scroll(0)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.shown))
+            self.scroll(0)
+        elif unit == "pages":
+            self.scroll(int(amount) * self.page_size)
+        else:
+            self.scroll(int(amount))
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-delta * 3)
@@ -1,11 +1,15 @@
 import sys
+from multiprocessing import freeze_support
 
 
 def main():
-    if len(sys.argv) != 1:
-        # Invalid format
-        print("Usage: python run.py")
-        sys.exit(1)
+    # Needed for worker processes in the PyInstaller build
+    freeze_support()
+
+    if len(sys.argv) > 1:
+        # Headless subcommands, without loading the GUI
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
     
     from gui_app import main as gui_main
     gui_main()
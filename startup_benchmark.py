@@ -0,0 +1,108 @@
+"""
+Startup benchmark for the GUI: measures the time from launching Python to the first window
+being drawn, with -X importtime to show which imports it is spent on.
+Exits with 1 if the time goes over the budget or a heavy module is imported before the window.
+
+    python startup_benchmark.py [--budget SECONDS] [--runs N]
+
+Needs a display, like the app itself.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DEFAULT_BUDGET_SECONDS = 1.5
+
+# Only needed once a check or amindefy runs, so they must not slow down startup
+DEFERRED_MODULES = ["pandas", "numpy", "openpyxl", "PIL"]
+
+FIRST_WINDOW_MARKER = "FIRST_WINDOW"
+
+# Builds the window like gui_app.main, but stops once it is drawn. after_window_shown is not
+# scheduled, so the background warm up imports do not show up in the measurement.
+_STARTUP_SCRIPT = f"""
+import sys
+import tkinter as tk
+import gui_app
+
+root = tk.Tk()
+app = gui_app.TimesheetCheckerApp(root)
+root.update()
+print("{FIRST_WINDOW_MARKER}", flush=True)
+root.destroy()
+"""
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Measure the time to the first window of the GUI.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="maximum allowed time in seconds")
+    parser.add_argument("--runs", type=int, default=3, help="number of launches, the fastest one is kept")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    results = [measure_startup() for _ in range(args.runs)]
+    elapsed, imports = min(results, key=lambda result: result[0])
+
+    print(f"Time to first window: {elapsed:.3f}s (budget {args.budget:.3f}s, best of {args.runs})")
+    print("\nSlowest imports before the window:")
+    top_level = [(module, cumulative_us) for module, cumulative_us, depth in imports if depth == 0]
+    for module, cumulative_us in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative_us / 1e6:8.3f}s  {module}")
+
+    failed = False
+    imported = {module.split(".")[0] for module, _, _ in imports}
+    early_modules = [module for module in DEFERRED_MODULES if module in imported]
+    if early_modules:
+        print(f"\nImported before the window but should be deferred: {', '.join(early_modules)}")
+        failed = True
+    if elapsed > args.budget:
+        print(f"\nStartup is over budget by {elapsed - args.budget:.3f}s")
+        failed = True
+
+    return 1 if failed else 0
+
+
+def measure_startup() -> tuple[float, list[tuple[str, int, int]]]:
+    """
+    Launch the GUI once. Returns the seconds until the first window was drawn and the
+    imports done before it, as parsed by parse_importtime.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    end = time.perf_counter()
+
+    if FIRST_WINDOW_MARKER not in result.stdout:
+        raise RuntimeError(f"The GUI did not start:\n{result.stderr[-2000:]}")
+
+    # Teardown after the marker is negligible next to startup
+    return end - start, parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> list[tuple[str, int, int]]:
+    """
+    (module, cumulative microseconds, nesting depth) of each import in -X importtime output,
+    whose lines look like "import time:       263 |        263 |   package.module" with
+    two more spaces of indent per nesting level. Depth 0 imports were done by the script itself.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(cumulative), depth))
+    return imports
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
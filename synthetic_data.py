@@ -0,0 +1,216 @@
+"""
+Synthetic sign in sheets and timesheets in the layouts the checks read, scaled by the number
+of coaches and sessions per coach, for benchmarks and trying out changes on realistic data.
+
+    python synthetic_data.py OUTPUT_FOLDER [--coaches N] [--sessions N] [--months October ...]
+
+Writes the sign in workbook, a rates file and a folder of timesheets per month, named like
+find_season_timesheets expects. A few timesheets are given discrepancies on purpose.
+"""
+import argparse
+import calendar
+import os
+import random
+import sys
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from check_timesheets import DATE_COL, WEEKDAY_COL, RATE_COL, COL_NAMES
+from rates import RateTimeline, write_rate_timeline
+from read_sign_in import NAME_COL, LEVEL_COL
+
+# Rate of each level, with the levels of most coaches first
+DEFAULT_RATES = {
+    "L1": 12.0, "L2": 15.5, "NQL2": 14.0, "Enhanced L2": 17.0, "Lower Enhanced L2": 16.0,
+    "Safeguarding": 13.0, "Admin": 11.5, "Gala Full Day": 90.0, "Gala Half Day": 50.0,
+}
+COACH_LEVELS = ["L1", "L2", "L2", "NQL2", "Enhanced L2", "Lower Enhanced L2"]
+
+SESSION_HOURS = [1.0, 1.5, 2.0, 2.5, 3.0]
+
+# Column of the sign in sheet between the level and the dates
+NOTES_COL = "Notes"
+
+# Sheet rows of the timesheet template: the name cells, then the table header
+FIRST_NAME_ROW = 5
+LAST_NAME_ROW = 6
+TIMESHEET_HEADER_ROW = 8
+
+SIGN_IN_SHEET_FILENAME = "Sign in sheet.xlsx"
+RATES_FILENAME = "rates.json"
+
+
+class Coach:
+    def __init__(self, first_name: str, last_name: str, level: str, sessions: dict[str, list[tuple[datetime, float]]]):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.level = level
+        # (date, hours) of each session, by month
+        self.sessions = sessions
+
+    @property
+    def name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+def month_dates(month: str, season_start_year: int) -> list[datetime]:
+    """
+    Every day of a month of the season, which runs from September to July.
+    """
+    month_number = list(calendar.month_name).index(month)
+    year = season_start_year if month_number >= 9 else season_start_year + 1
+    days = calendar.monthrange(year, month_number)[1]
+    return [datetime(year, month_number, day) for day in range(1, days + 1)]
+
+
+def make_coaches(coaches: int, sessions_per_coach: int, months: list[str], season_start_year: int, rng: random.Random) -> list[Coach]:
+    """
+    Coaches with a level and up to sessions_per_coach sessions on distinct days of each month.
+    """
+    dates_by_month = {month: month_dates(month, season_start_year) for month in months}
+
+    result = []
+    for i in range(coaches):
+        sessions = {}
+        for month, dates in dates_by_month.items():
+            days = sorted(rng.sample(dates, min(sessions_per_coach, len(dates))))
+            sessions[month] = [(day, rng.choice(SESSION_HOURS)) for day in days]
+        result.append(Coach(f"Coach{i}", f"Surname{i}", rng.choice(COACH_LEVELS), sessions))
+    return result
+
+
+def write_sign_in_workbook(file_path: str, coaches: list[Coach], months: list[str], season_start_year: int):
+    """
+    One sheet per month: a Name, Level and Notes column then a column per day, with the
+    hours of each session, followed by an LHC row, a blank row and a totals row like the real sheet.
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+    for month in months:
+        ws = wb.create_sheet(month)
+        dates = month_dates(month, season_start_year)
+        day_index = {day: i for i, day in enumerate(dates)}
+
+        ws.append([NAME_COL, LEVEL_COL, NOTES_COL] + dates)
+        totals = [0.0] * len(dates)
+        for coach in coaches:
+            cells = [None] * len(dates)
+            for day, hours in coach.sessions[month]:
+                cells[day_index[day]] = hours
+                totals[day_index[day]] += hours
+            ws.append([coach.name, coach.level, None] + cells)
+
+        # Not paid through timesheets, so skipped by the checks
+        ws.append(["Lifeguard Helper", "LHC", None] + [1.0] * len(dates))
+        ws.append([])
+        ws.append(["Total", None, None] + totals)
+    wb.save(file_path)
+
+
+def write_timesheet(file_path: str, first_name: str, last_name: str, sessions: list[tuple[datetime, float, float]], rng: random.Random):
+    """
+    A timesheet in the template layout: the name cells near the top, then a table with one row
+    per (date, hours, rate) session, each with its hours in one of the hours columns.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Timesheet"
+
+    rows = [[] for _ in range(TIMESHEET_HEADER_ROW - 1)]
+    rows[0] = ["Coach timesheet"]
+    rows[FIRST_NAME_ROW - 1] = [None, "First name", first_name]
+    rows[LAST_NAME_ROW - 1] = [None, "Last name", last_name]
+    for row in rows:
+        ws.append(row)
+
+    ws.append([DATE_COL, WEEKDAY_COL] + COL_NAMES + [RATE_COL])
+    for day, hours, rate in sessions:
+        # Mostly coaching hours, sometimes one of the other columns
+        hours_cells = [None] * len(COL_NAMES)
+        hours_cells[0 if rng.random() < 0.8 else rng.randrange(len(COL_NAMES))] = hours
+        ws.append([day, day.strftime("%A")] + hours_cells + [rate])
+
+    ws.append([])
+    ws.append(["Total", None, sum(hours for _, hours, _ in sessions)])
+    wb.save(file_path)
+
+
+def generate_season(
+    output_folder: str,
+    coaches: int = 10,
+    sessions_per_coach: int = 8,
+    months: list[str] | None = None,
+    season_start_year: int = 2025,
+    discrepancy_rate: float = 0.05,
+    seed: int = 0,
+) -> dict[str, str]:
+    """
+    Write a sign in workbook, a rates file and a folder of timesheets per month to output_folder.
+    About discrepancy_rate of the timesheets get a discrepancy: different hours, a different rate,
+    an extra session or a misspelt name. The same seed always gives the same files.
+    Returns a map from month to its timesheet folder.
+    """
+    months = months or ["October"]
+    rng = random.Random(seed)
+    os.makedirs(output_folder, exist_ok=True)
+
+    coach_list = make_coaches(coaches, sessions_per_coach, months, season_start_year, rng)
+    write_sign_in_workbook(os.path.join(output_folder, SIGN_IN_SHEET_FILENAME), coach_list, months, season_start_year)
+    write_rate_timeline(os.path.join(output_folder, RATES_FILENAME), RateTimeline(dict(DEFAULT_RATES)))
+
+    timesheet_folders = {}
+    for month in months:
+        folder = os.path.join(output_folder, month)
+        os.makedirs(folder, exist_ok=True)
+        timesheet_folders[month] = folder
+
+        for coach in coach_list:
+            rate = DEFAULT_RATES[coach.level]
+            sessions = [(day, hours, rate) for day, hours in coach.sessions[month]]
+            first_name = coach.first_name
+
+            if sessions and rng.random() < discrepancy_rate:
+                i = rng.randrange(len(sessions))
+                day, hours, rate = sessions[i]
+                kind = rng.randrange(4)
+                if kind == 0:
+                    sessions[i] = (day, hours + 0.5, rate)
+                elif kind == 1:
+                    sessions[i] = (day, hours, rate + 1.0)
+                elif kind == 2:
+                    sessions.append((day, 1.0, rate))
+                else:
+                    first_name = first_name[:-1]
+
+            write_timesheet(os.path.join(folder, f"{coach.name}.xlsx"), first_name, coach.last_name, sessions, rng)
+
+    return timesheet_folders
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Write synthetic sign in sheets and timesheets.")
+    parser.add_argument("output_folder", help="folder to write the files to")
+    parser.add_argument("--coaches", type=int, default=10, help="number of coaches")
+    parser.add_argument("--sessions", type=int, default=8, help="sessions per coach per month")
+    parser.add_argument("--months", nargs="+", default=["October"], help="months of the sign in sheet")
+    parser.add_argument("--year", type=int, default=2025, help="year the season starts in")
+    parser.add_argument("--discrepancy-rate", type=float, default=0.05, help="share of timesheets given a discrepancy")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    for month in args.months:
+        if month not in calendar.month_name[1:]:
+            parser.error(f"Unknown month {month}")
+
+    timesheet_folders = generate_season(
+        args.output_folder, args.coaches, args.sessions, args.months, args.year, args.discrepancy_rate, args.seed,
+    )
+    print(f"Wrote {args.coaches} coaches to {os.path.join(args.output_folder, SIGN_IN_SHEET_FILENAME)}")
+    for month, folder in timesheet_folders.items():
+        print(f"  {month}: {folder}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,58 @@
+"""
+Entries with invalid hours or rates only match entries with the same invalid value.
+"""
+from datetime import date
+
+from check_timesheets import match_timesheet, surplus_entries
+from discrepancies import TimesheetExtraEntry
+from entry import Entry
+
+DAY = date(2025, 10, 6)
+
+
+def test_negative_hours_are_told_apart():
+    timesheet = [Entry(DAY, -1.0, 15.5)]
+    sign_in = [Entry(DAY, -2.0, 15.5)]
+
+    assert surplus_entries(timesheet, sign_in) == [(timesheet[0], 1)]
+    assert surplus_entries(sign_in, timesheet) == [(sign_in[0], 1)]
+
+
+def test_missing_rate_does_not_match_text_rate():
+    timesheet = [Entry(DAY, 2.0, float("nan"))]
+    sign_in_data = {"Coach One": [Entry(DAY, 2.0, "£15")]}
+
+    discrepancies = []
+    match_timesheet("Coach One", timesheet, sign_in_data, discrepancies, quiet=True)
+
+    assert len(discrepancies) == 1
+    assert isinstance(discrepancies[0], TimesheetExtraEntry)
+    assert discrepancies[0].entry is timesheet[0]
+    # The sign in entry is left over as well
+    assert sign_in_data["Coach One"] == [Entry(DAY, 2.0, "£15")]
+
+
+def test_same_invalid_values_still_match():
+    timesheet = [Entry(DAY, 2.0, None), Entry(DAY, 1.0, "£15")]
+    sign_in = [Entry(DAY, 2.0, float("nan")), Entry(DAY, 1.0, " £15 ")]
+
+    assert surplus_entries(timesheet, sign_in) == []
+
+
+def test_float_noise_still_matches():
+    assert Entry(DAY, 2.4999999, 14) == Entry(DAY, 2.5, 14.0)
+    assert Entry(DAY, -1.0, 14) != Entry(DAY, -2.0, 14)
+
+
+def test_remapped_name_is_reported():
+    timesheet = [Entry(DAY, 2.0, 15.5)]
+    sign_in_data = {"Coach Zero": [Entry(DAY, 2.0, 15.5)], "Another Coach": []}
+
+    discrepancies = []
+    match_timesheet("Coach Zerox", timesheet, sign_in_data, discrepancies, remap_names=True, sheet_name="Coach Zerox", quiet=True)
+
+    assert len(discrepancies) == 1
+    record = discrepancies[0].to_record("October")
+    assert (record["type"], record["coach"], record["sign_in_name"], record["sheet"]) == ("remapped_name", "Coach Zerox", "Coach Zero", "Coach Zerox")
+    # The entries were checked under the sign in name
+    assert sign_in_data["Coach Zero"] == []
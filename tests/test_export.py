@@ -0,0 +1,27 @@
+"""
+Exported records are valid JSON whatever the hours and rates of the entries.
+"""
+import io
+import json
+from datetime import date
+
+import numpy as np
+
+from discrepancies import HoursMismatch, TimesheetExtraEntry
+from discrepancies.export import JsonLinesWriter
+from entry import Entry
+
+DAY = date(2025, 10, 6)
+
+
+def test_missing_values_are_written_as_null():
+    stream = io.StringIO()
+    with JsonLinesWriter(stream) as writer:
+        writer.write(TimesheetExtraEntry(name="Coach One", entry=Entry(DAY, np.float64(2.0), float("nan"))), "October")
+        writer.write(HoursMismatch(
+            name="Coach Two", timesheet_entry=Entry(DAY, np.int64(3), "£15"), sign_in_entry=Entry(DAY, float("inf"), 15.0),
+        ), "October")
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert (records[0]["hours"], records[0]["rate"]) == (2.0, None)
+    assert (records[1]["hours"], records[1]["rate"], records[1]["sign_in_hours"]) == (3, "£15", None)
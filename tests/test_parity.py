@@ -0,0 +1,282 @@
+"""
+The faster code paths give the same results as a straightforward reference implementation:
+vectorised sign in and timesheet parsing, parallel and cached reading, multiset matching,
+and parallel and xml amindefy.
+"""
+import contextlib
+import io
+import os
+import random
+import re
+import zipfile
+from collections import Counter, defaultdict
+from datetime import date
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+from amindefy import amindefy_timesheets
+from check_timesheets import (
+    DATE_COL, WEEKDAY_COL, RATE_COL, COL_NAMES,
+    match_timesheets, read_timesheet, read_timesheets, read_timesheet_folder, surplus_entries,
+    _read_timesheet_file,
+)
+from entry import Entry
+from read_sign_in import read_sign_in_sheet, NAME_COL, LEVEL_COL
+from synthetic_data import generate_season, write_timesheet, DEFAULT_RATES, SIGN_IN_SHEET_FILENAME, TIMESHEET_HEADER_ROW
+from timesheet_cache import TimesheetCache
+
+MONTH = "October"
+RATE_CHANGE_DATE = "15/10/2025"
+RATES_AFTER = {level: rate + 0.5 for level, rate in DEFAULT_RATES.items()}
+
+
+def reference_sign_in_sheet(month, file_path, rates, rates_after, rate_change_date):
+    """
+    The original cell by cell sign in reader, keeping duplicate sessions.
+    """
+    sign_df = pd.read_excel(file_path, month, header=0)
+    data = defaultdict(list)
+    for _, row in sign_df.iterrows():
+        if pd.isna(row[LEVEL_COL]) or row[LEVEL_COL] == "LHC":
+            continue
+        for col in sign_df.columns[3:]:
+            if pd.isna(row[col]):
+                continue
+            if rate_change_date and rates_after and col.date() >= pd.to_datetime(rate_change_date, format="%d/%m/%Y").date():
+                rate = rates_after[row[LEVEL_COL]]
+            else:
+                rate = rates[row[LEVEL_COL]]
+            data[row[NAME_COL].strip()].append(Entry(date=col.date(), hours=float(row[col]), rate=rate))
+    return data
+
+
+def reference_read_timesheet(df):
+    """
+    The original row by row timesheet reader.
+    """
+    name = str(df.iloc[3, 2]).strip() + " " + str(df.iloc[4, 2]).strip()
+    header_row_index = df[df.iloc[:, 0] == DATE_COL].index[0]
+    table_df = df.iloc[header_row_index:].reset_index(drop=True)
+    table_df.columns = table_df.iloc[0]
+    table_df = table_df[1:].dropna(subset=[DATE_COL, WEEKDAY_COL])
+
+    entries = []
+    for _, row in table_df.iterrows():
+        hours_worked = [col_name for col_name in COL_NAMES if pd.notna(row[col_name])]
+        assert len(hours_worked) == 1
+        entries.append(Entry(date=row[DATE_COL].date(), hours=float(row[hours_worked[0]]), rate=row[RATE_COL]))
+    return name, entries
+
+
+def reference_surplus(entries, other_entries) -> Counter:
+    """
+    Match entries one by one, comparing their values rounded to hundredths.
+    """
+    def value(entry):
+        return (entry.date, round(entry.hours, 2), round(entry.rate, 2))
+
+    remaining = [value(entry) for entry in other_entries]
+    surplus = Counter()
+    for entry in entries:
+        if value(entry) in remaining:
+            remaining.remove(value(entry))
+        else:
+            surplus[value(entry)] += 1
+    return surplus
+
+
+def entry_values(entries) -> list[tuple]:
+    return [(entry.date, entry.hours, entry.rate) for entry in entries]
+
+
+def timesheet_values(timesheets) -> list:
+    return [
+        (sheet_name, None if timesheet is None else (timesheet[0], entry_values(timesheet[1])))
+        for sheet_name, timesheet in timesheets
+    ]
+
+
+@pytest.fixture(scope="module")
+def season(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("season")
+    generate_season(str(folder), coaches=12, sessions_per_coach=6, discrepancy_rate=0.3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        amindefy_timesheets(str(folder / MONTH), str(folder / "serial.xlsx"))
+    return folder
+
+
+def test_sign_in_sheet_matches_reference(season):
+    args = (MONTH, str(season / SIGN_IN_SHEET_FILENAME), DEFAULT_RATES, RATES_AFTER, RATE_CHANGE_DATE)
+    expected = reference_sign_in_sheet(*args)
+    actual = read_sign_in_sheet(*args)
+
+    assert list(actual) == list(expected)
+    for name in expected:
+        assert entry_values(actual[name]) == entry_values(expected[name])
+
+
+def test_read_timesheet_matches_reference(season):
+    for filename in sorted(os.listdir(season / MONTH)):
+        df = pd.read_excel(season / MONTH / filename)
+        name, entries = read_timesheet(df)
+        expected_name, expected_entries = reference_read_timesheet(df)
+        assert name == expected_name
+        assert entry_values(entries) == entry_values(expected_entries)
+
+
+@pytest.mark.parametrize("reader", ["pandas", "openpyxl"])
+def test_readers_match_serial_pandas(season, tmp_path, reader):
+    workbook = str(season / "serial.xlsx")
+    expected = timesheet_values(read_timesheets(workbook))
+
+    assert timesheet_values(read_timesheets(workbook, reader=reader)) == expected
+    assert timesheet_values(read_timesheets(workbook, workers=2, reader=reader)) == expected
+    assert timesheet_values(read_timesheet_folder(str(season / MONTH), workers=2, reader=reader)) == expected
+
+    # Once to fill the cache, once from it
+    cache = TimesheetCache(str(tmp_path / "cache"))
+    for _ in range(2):
+        assert timesheet_values(read_timesheets(workbook, reader=reader, cache=cache)) == expected
+    assert cache.hits == len(expected)
+
+
+def test_openpyxl_reader_handles_what_pandas_does(tmp_path):
+    # "N/A" in an unused hours column, and no dimension tag giving the size of the sheet
+    path = str(tmp_path / "Coach One.xlsx")
+    sessions = [(pd.Timestamp(2025, 10, day).to_pydatetime(), 2.0, 15.5) for day in (6, 13)]
+    write_timesheet(path, "Coach", "One", sessions, random.Random(1))
+    wb = load_workbook(path)
+    wb.active.cell(row=TIMESHEET_HEADER_ROW + 1, column=2 + len(COL_NAMES)).value = "N/A"
+    wb.save(path)
+
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: zf.read(name) for name in zf.namelist()}
+    sheet_part = next(name for name in parts if name.startswith("xl/worksheets/"))
+    parts[sheet_part] = re.sub(rb"<dimension[^>]*/>", b"", parts[sheet_part])
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+    expected = _read_timesheet_file(path, "pandas")
+    assert expected[1] is not None
+    actual = _read_timesheet_file(path, "openpyxl")
+    assert timesheet_values([actual]) == timesheet_values([expected])
+
+
+def test_parallel_check_matches_serial(season):
+    def records(workers):
+        sign_in_data = read_sign_in_sheet(MONTH, str(season / SIGN_IN_SHEET_FILENAME), DEFAULT_RATES, None, None)
+        timesheets = read_timesheets(str(season / "serial.xlsx"), workers=workers)
+        return [discrepancy.to_record(MONTH) for discrepancy in match_timesheets(timesheets, sign_in_data, quiet=True)]
+
+    expected = records(1)
+    assert expected
+    assert records(2) == expected
+
+
+def test_surplus_entries_match_reference():
+    rng = random.Random(0)
+    days = [date(2025, 10, day) for day in range(1, 6)]
+
+    def random_entries(count):
+        # Few distinct values so there are plenty of duplicates, and float noise that rounds away
+        return [
+            Entry(rng.choice(days), rng.choice([1.0, 1.5, 2.0]) + rng.choice([0, 1e-9, -1e-9]), rng.choice([12.0, 15.5]))
+            for _ in range(count)
+        ]
+
+    for _ in range(50):
+        entries, other_entries = random_entries(rng.randrange(30)), random_entries(rng.randrange(30))
+        surplus = surplus_entries(entries, other_entries)
+
+        actual = Counter()
+        for entry, count in surplus:
+            actual[(entry.date, round(entry.hours, 2), round(entry.rate, 2))] += count
+        assert actual == reference_surplus(entries, other_entries)
+
+
+def workbook_parts(path) -> dict[str, bytes]:
+    # Except the document properties, which hold the time the workbook was written
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist() if not name.startswith("docProps/")}
+
+
+def workbook_cells(path) -> dict[str, tuple]:
+    wb = load_workbook(path)
+    return {
+        ws.title: (
+            [
+                (cell.coordinate, cell.value, cell.number_format, cell.font.b, cell.font.i, cell.fill.fgColor.rgb, cell.alignment.horizontal, cell.border.left.style)
+                for row in ws.iter_rows() for cell in row if cell.value is not None or cell.has_style
+            ],
+            sorted(str(cell_range) for cell_range in ws.merged_cells.ranges),
+            {column: dimension.width for column, dimension in ws.column_dimensions.items()},
+        )
+        for ws in wb
+    }
+
+
+def test_parallel_amindefy_matches_serial(season, tmp_path):
+    output = str(tmp_path / "parallel.xlsx")
+    with contextlib.redirect_stdout(io.StringIO()):
+        amindefy_timesheets(str(season / MONTH), output, workers=2)
+
+    assert workbook_parts(output) == workbook_parts(str(season / "serial.xlsx"))
+
+
+def test_xml_amindefy_matches_serial(season, tmp_path):
+    # Written by another writer, so compared cell by cell rather than byte for byte
+    output = str(tmp_path / "xml.xlsx")
+    with contextlib.redirect_stdout(io.StringIO()):
+        amindefy_timesheets(str(season / MONTH), output, engine="xml")
+
+    assert workbook_cells(output) == workbook_cells(str(season / "serial.xlsx"))
+
+
+def test_xml_amindefy_keeps_dates_of_1904_workbooks(season, tmp_path):
+    # Timesheets saved with the Mac 1904 date system store other day numbers for the same dates
+    folder = tmp_path / MONTH
+    folder.mkdir()
+    for filename in sorted(os.listdir(season / MONTH)):
+        wb = load_workbook(season / MONTH / filename)
+        wb.epoch = CALENDAR_MAC_1904
+        wb.save(folder / filename)
+
+    output = str(tmp_path / "xml.xlsx")
+    with contextlib.redirect_stdout(io.StringIO()):
+        amindefy_timesheets(str(folder), output, engine="xml")
+
+    assert workbook_cells(output) == workbook_cells(str(season / "serial.xlsx"))
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "xml"])
+def test_incremental_amindefy_matches_full_rebuild(season, tmp_path, engine):
+    folder = tmp_path / MONTH
+    folder.mkdir()
+    filenames = sorted(os.listdir(season / MONTH))
+    for filename in filenames:
+        (folder / filename).write_bytes((season / MONTH / filename).read_bytes())
+
+    output = str(tmp_path / "incremental.xlsx")
+    with contextlib.redirect_stdout(io.StringIO()):
+        amindefy_timesheets(str(folder), output, engine=engine, incremental=True)
+
+    # Change one timesheet, delete another and add a new one
+    wb = load_workbook(folder / filenames[0])
+    wb.active["C5"] = "Changed"
+    wb.save(folder / filenames[0])
+    os.remove(folder / filenames[1])
+    (folder / "New Coach.xlsx").write_bytes((season / MONTH / filenames[1]).read_bytes())
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        amindefy_timesheets(str(folder), output, engine=engine, incremental=True)
+    assert "Updated 1, added 1 and removed 1 timesheets" in log.getvalue()
+
+    rebuilt = str(tmp_path / "rebuilt.xlsx")
+    with contextlib.redirect_stdout(io.StringIO()):
+        amindefy_timesheets(str(folder), rebuilt)
+    assert workbook_cells(output) == workbook_cells(rebuilt)
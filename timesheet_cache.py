@@ -0,0 +1,206 @@
+"""
+On-disk caches of parsed timesheets and sign in data, keyed by hashes of their contents.
+"""
+import hashlib
+import os
+import pickle
+import re
+import zipfile
+from datetime import date
+from xml.etree import ElementTree as ET
+
+from entry import Entry
+from xlsx_transplant import MAIN_NS, REL_NS, OFFICE_DOCUMENT_REL, read_relationships
+
+# Bump when the parsing or the stored format changes so old results are not reused
+CACHE_FORMAT = "timesheet-cache-2"
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SHARED_STRING_RE = re.compile(r"<si\b[^>]*?(?:/>|>.*?</si>)", re.S)
+_SHARED_STRING_CELL_RE = re.compile(rb'<c\b[^>]*?\st="s"[^>]*>\s*<v>\s*(\d+)\s*</v>')
+_STYLED_TAG_RE = re.compile(rb'<(?:c|row)\b[^>]*?\ss="\d+"[^>]*>')
+_STYLE_ATTR_RE = re.compile(rb'(\ss=")(\d+)(")')
+
+
+class DiskCache:
+    """
+    Directory of pickled values, one file per key.
+    Least recently used files are removed once the directory grows over max_bytes.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def load(self, key: str):
+        """
+        Return the value stored for key, or raise KeyError.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            raise KeyError(key)
+
+        # Mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def store(self, key: str, value):
+        # Write to a temporary file first so a crash never leaves a half written entry
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        """
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+
+class TimesheetCache(DiskCache):
+    """
+    Parsed timesheets, keyed by a hash of the sheet contents.
+    Raises KeyError for a missing key, like a dict.
+    """
+    def __getitem__(self, key: str):
+        stored = self.load(key)
+        if stored is None:
+            return None
+        name, rows = stored
+        return name, decode_entries(rows)
+
+    def __setitem__(self, key: str, timesheet):
+        if timesheet is None:
+            self.store(key, None)
+        else:
+            name, entries = timesheet
+            self.store(key, (name, encode_entries(entries)))
+
+    def summary(self) -> str:
+        return f"Timesheet cache: {self.hits} hits, {self.misses} misses"
+
+
+def encode_entries(entries) -> list[tuple]:
+    """
+    Compact picklable form of entries.
+    """
+    return [(entry.date.toordinal(), entry.hours, entry.rate) for entry in entries]
+
+
+def decode_entries(rows) -> list[Entry]:
+    return [Entry(date=date.fromordinal(ordinal), hours=hours, rate=rate) for ordinal, hours, rate in rows]
+
+
+def cache_key(digest: str, reader: str) -> str:
+    return hashlib.sha256(f"{CACHE_FORMAT}:{reader}:{digest}".encode()).hexdigest()
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Hash of a whole file.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sheet_digests(xlsx_path: str) -> dict[str, str]:
+    """
+    Hash of each sheet of a workbook, from the raw sheet XML and the shared strings it uses.
+    Other sheets changing does not change a sheet's hash.
+    """
+    with zipfile.ZipFile(xlsx_path) as zf:
+        workbook_part = next(target for _, rel_type, target in read_relationships(zf, "") if rel_type == OFFICE_DOCUMENT_REL)
+        rel_targets = {rel_id: target for rel_id, _, target in read_relationships(zf, workbook_part)}
+
+        shared_strings_part = next((target for target in rel_targets.values() if target.endswith("sharedStrings.xml")), None)
+        shared_strings = None
+
+        styles_part = next((target for target in rel_targets.values() if target.endswith("styles.xml")), None)
+        style_formats = _style_formats(zf.read(styles_part)) if styles_part else None
+
+        digests = {}
+        workbook = ET.fromstring(zf.read(workbook_part))
+        for sheet in workbook.findall(f"{{{MAIN_NS}}}sheets/{{{MAIN_NS}}}sheet"):
+            sheet_xml = zf.read(rel_targets[sheet.get(f"{{{REL_NS}}}id")])
+            if style_formats is not None:
+                sheet_xml = _canonical_styles(sheet_xml, style_formats)
+            digest = hashlib.sha256(sheet_xml)
+
+            # Shared string cells only hold an index, so hash the strings themselves
+            indices = _SHARED_STRING_CELL_RE.findall(sheet_xml)
+            if indices:
+                if shared_strings is None:
+                    shared_strings = _SHARED_STRING_RE.findall(zf.read(shared_strings_part).decode("utf-8"))
+                for index in indices:
+                    digest.update(shared_strings[int(index)].encode("utf-8"))
+
+            digests[sheet.get("name")] = digest.hexdigest()
+
+    return digests
+
+
+def _style_formats(styles_xml: bytes) -> list[bytes]:
+    """
+    Number format of each cell style of a workbook, by style index.
+    The number format is the only part of a style parsing depends on, e.g. whether a number is a date.
+    """
+    styles = ET.fromstring(styles_xml)
+    format_codes = {
+        num_fmt.get("numFmtId"): num_fmt.get("formatCode", "")
+        for num_fmt in styles.iterfind(f"{{{MAIN_NS}}}numFmts/{{{MAIN_NS}}}numFmt")
+    }
+    formats = []
+    for xf in styles.iterfind(f"{{{MAIN_NS}}}cellXfs/{{{MAIN_NS}}}xf"):
+        num_fmt_id = xf.get("numFmtId", "0")
+        # Built in formats have no formatCode, their id is the same in every workbook
+        code = format_codes.get(num_fmt_id)
+        # Hex so a format code with quotes still fits in the attribute it replaces
+        formats.append((f"builtin {num_fmt_id}" if code is None else code).encode("utf-8").hex().encode())
+    return formats
+
+
+def _canonical_styles(sheet_xml: bytes, style_formats: list[bytes]) -> bytes:
+    """
+    sheet_xml with each style index replaced by its number format.
+    Style indices are shared by the whole workbook, so adding a style in one sheet renumbers the
+    styles of later sheets without changing how they parse.
+    """
+    def canonical_style(match):
+        index = int(match.group(2))
+        style = style_formats[index] if index < len(style_formats) else match.group(2)
+        return match.group(1) + style + match.group(3)
+
+    return _STYLED_TAG_RE.sub(lambda tag: _STYLE_ATTR_RE.sub(canonical_style, tag.group(0)), sheet_xml)
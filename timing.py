@@ -0,0 +1,180 @@
+"""
+Lightweight stage timers for checks and amindefy, and opt-in profiling.
+
+Code marks its stages with timed(), which does nothing unless timings are being collected
+in the current thread:
+
+    with collect_timings() as timer:
+        check_timesheets(...)
+    print(timer.summary())
+
+Stages nest, and a stage is only charged the time not spent in the stages inside it,
+so the stage times add up to the total.
+"""
+import contextlib
+import contextvars
+import cProfile
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Folder to write profiles of GUI runs to. Profiling is off when it is not set
+PROFILE_DIR_ENV = "TIMESHEET_CHECKER_PROFILE_DIR"
+
+_active_timer = contextvars.ContextVar("active_timer", default=None)
+
+
+class Stage:
+    """
+    A running stage. item may be set inside the stage, e.g. once the sheet being read is known.
+    """
+    def __init__(self, name: str, item: str | None = None):
+        self.name = name
+        self.item = item
+        self.counted = True
+        self.child_seconds = 0.0
+
+
+class StageTimer:
+    """
+    Total time and count of each stage, and the time of each item (sheet or file) within a stage.
+    """
+    def __init__(self):
+        self.stages = {}
+        self.items = {}
+        self.start = time.perf_counter()
+        self.end = None
+        self._running = []
+
+    @property
+    def total_seconds(self) -> float:
+        # So far, while still collecting
+        return (self.end or time.perf_counter()) - self.start
+
+    @contextlib.contextmanager
+    def stage(self, name: str, item: str | None = None):
+        stage = Stage(name, item)
+        parent = self._running[-1] if self._running else None
+        self._running.append(stage)
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - start
+            self._running.pop()
+            if parent is not None:
+                parent.child_seconds += elapsed
+            self.add(name, elapsed - stage.child_seconds, stage.item, stage.counted)
+
+    def add(self, name: str, seconds: float, item: str | None = None, counted: bool = True):
+        totals = self.stages.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += counted
+        if item is not None:
+            items = self.items.setdefault(name, {})
+            items[item] = items.get(item, 0.0) + seconds
+
+    def summary(self, slowest: int = 3) -> str:
+        """
+        Stages from slowest to fastest, each with its slowest items.
+        """
+        total_seconds = self.total_seconds
+        lines = [f"Timings ({total_seconds:.2f}s in total):"]
+        for name, (seconds, count) in sorted(self.stages.items(), key=lambda stage: -stage[1][0]):
+            share = f" ({seconds / total_seconds:.0%})" if total_seconds else ""
+            line = f"  {name}: {seconds:.3f}s{share}"
+            if count > 1:
+                line += f", {count} times at {seconds / count * 1000:.1f}ms each"
+            lines.append(line)
+
+            items = self.items.get(name, {})
+            if len(items) > 1:
+                for item, item_seconds in sorted(items.items(), key=lambda item: -item[1])[:slowest]:
+                    lines.append(f"      {item}: {item_seconds:.3f}s")
+
+        # Time spent outside of any stage
+        other = total_seconds - sum(seconds for seconds, _ in self.stages.values())
+        if self.stages and other > 0:
+            lines.append(f"  other: {other:.3f}s")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def collect_timings():
+    """
+    Time the stages run inside, in this thread. Yields the StageTimer.
+    """
+    timer = StageTimer()
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        timer.end = time.perf_counter()
+        _active_timer.reset(token)
+
+
+def timed(name: str, item: str | None = None):
+    """
+    Context manager timing a stage, yielding its Stage. Does nothing when no timings are collected.
+    Must not be held across a yield, as stages have to end in the order they started.
+    """
+    timer = _active_timer.get()
+    if timer is None:
+        return contextlib.nullcontext(Stage(name, item))
+    return timer.stage(name, item)
+
+
+def timed_iter(name: str, iterable, item=None):
+    """
+    Yield the values of iterable, timing how long each takes to come out as a stage.
+    item gives the item of a value, e.g. the sheet a (sheet_name, timesheet) pair is from.
+    """
+    iterator = iter(iterable)
+    while True:
+        with timed(name) as stage:
+            try:
+                value = next(iterator)
+            except StopIteration:
+                # Finishing up, e.g. closing worker processes, still takes time but is not a value
+                stage.counted = False
+                return
+            if item is not None:
+                stage.item = item(value)
+        yield value
+
+
+@contextlib.contextmanager
+def profile(output_prefix: str, memory: bool = True):
+    """
+    Profile the code run inside in this thread with cProfile, writing output_prefix.prof for
+    pstats or snakeviz. With memory, also trace allocations and write a snapshot to
+    output_prefix.tracemalloc, which tracemalloc.Snapshot.load reads back.
+    """
+    profiler = cProfile.Profile()
+    if memory:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{output_prefix}.prof")
+        if memory:
+            tracemalloc.take_snapshot().dump(f"{output_prefix}.tracemalloc")
+            tracemalloc.stop()
+        # Not to stdout, which may be carrying the records of a check
+        print(f"\nProfile written to {output_prefix}.prof", file=sys.stderr)
+
+
+def profile_from_environment(run_name: str):
+    """
+    profile() into the PROFILE_DIR_ENV folder if it is set, else a context manager doing nothing.
+    """
+    profile_dir = os.environ.get(PROFILE_DIR_ENV)
+    if not profile_dir:
+        return contextlib.nullcontext()
+
+    os.makedirs(profile_dir, exist_ok=True)
+    return profile(os.path.join(profile_dir, f"{run_name}-{datetime.now():%Y%m%d-%H%M%S}"))
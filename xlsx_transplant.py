@@ -0,0 +1,476 @@
+"""
+Combine the active sheets of several .xlsx files by copying their sheet XML straight into a new package.
+
+Only the indices that point outside a sheet are rewritten: cell/row/column style ids and shared
+string indices. No openpyxl cells are created, which is what makes this much faster than rebuilding
+every sheet cell by cell. Sheets that rely on anything else in their source package (drawings,
+comments, conditional formats, ...) raise TransplantError so the caller can fall back.
+"""
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from openpyxl.workbook.child import INVALID_TITLE_REGEX, avoid_duplicate_name
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+OFFICE_DOCUMENT_REL = REL_NS + "/officeDocument"
+WORKSHEET_REL = REL_NS + "/worksheet"
+STYLES_REL = REL_NS + "/styles"
+SHARED_STRINGS_REL = REL_NS + "/sharedStrings"
+THEME_REL = REL_NS + "/theme"
+PRINTER_SETTINGS_REL = REL_NS + "/printerSettings"
+
+CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml."
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Custom number formats start at this id, lower ids are built in
+FIRST_CUSTOM_NUM_FMT = 164
+
+_CELL_RE = re.compile(r"<c\b([^>]*?)(/>|>(.*?)</c>)", re.S)
+_ROW_RE = re.compile(r"<row\b[^>]*>")
+_COL_RE = re.compile(r"<col\b[^>]*>")
+_STYLE_ATTR_RE = re.compile(r'(\ss=")(\d+)(")')
+_COL_STYLE_ATTR_RE = re.compile(r'(\sstyle=")(\d+)(")')
+_SHARED_STRING_TYPE_RE = re.compile(r'\st="s"')
+_VALUE_RE = re.compile(r"(<v>)\s*(\d+)\s*(</v>)")
+_TAB_SELECTED_RE = re.compile(r'\stabSelected="(?:1|true)"')
+_PREFIX_DECL_RE = re.compile(r'\sxmlns:(\w+)="([^"]*)"')
+_TAG_RE = re.compile(r"<[^>]*>")
+_TAG_PREFIX_RE = re.compile(r"(?:^</?|\s)(\w+):[\w.-]+(?=[\s=/>])")
+_XF_ATTR_RE = re.compile(r'(\s(numFmtId|fontId|fillId|borderId|xfId)=")(\d+)(")')
+
+
+class TransplantError(Exception):
+    """
+    A sheet cannot be copied at the XML level and has to go through openpyxl instead.
+    """
+
+
+class WorkbookTransplanter:
+    """
+    Builds a workbook out of the active sheets of other .xlsx files.
+    The first file added provides the theme and the base style tables.
+    """
+    def __init__(self):
+        self.sheet_names = []
+        self.sheet_xmls = []
+
+        self.shared_strings = _IndexedParts()
+        self.num_fmts = {}  # format code -> id
+        self.fonts = _IndexedParts()
+        self.fills = _IndexedParts()
+        self.borders = _IndexedParts()
+        self.cell_xfs = _IndexedParts()
+
+        # Taken from the first file
+        self.styles_root = None
+        self.cell_style_xfs = None
+        self.cell_styles = None
+        self.colors = None
+        self.theme = None
+
+    def add_sheet(self, source, sheet_name: str):
+        """
+        Copy the active sheet of source (a path or file object) in as a new sheet.
+        Raises TransplantError if the sheet cannot be copied at the XML level.
+        """
+        if INVALID_TITLE_REGEX.search(sheet_name):
+            raise ValueError("Invalid character found in sheet title")
+
+        self._add_package(_read_package(source), [sheet_name])
+
+    def add_sheets(self, source, sheet_names: list[str]):
+        """
+        Copy the named sheets of source in, keeping their names. The source is only read once,
+        e.g. to carry the unchanged sheets of an earlier output over.
+        Raises TransplantError if any of them cannot be copied at the XML level.
+        """
+        self._add_package(_read_package(source, sheet_names), sheet_names)
+
+    def reorder(self, sheet_names: list[str]):
+        """
+        Put the sheets in the order of sheet_names, which must name each sheet once.
+        """
+        xml_by_name = dict(zip(self.sheet_names, self.sheet_xmls))
+        self.sheet_names = list(sheet_names)
+        self.sheet_xmls = [xml_by_name[name] for name in sheet_names]
+
+    def _add_package(self, package, sheet_names: list[str]):
+        if self.styles_root is None:
+            self._init_styles(package)
+
+        style_map = self._merge_styles(package["styles"])
+        string_map = [self.shared_strings.add(si) for si in package["shared_strings"]]
+        # Rewrite every sheet before adding any, so a failure adds none of them
+        sheet_xmls = [_rewrite_sheet(sheet, style_map, string_map) for sheet in package["sheets"]]
+
+        for sheet_name, sheet_xml in zip(sheet_names, sheet_xmls):
+            self.sheet_names.append(avoid_duplicate_name(self.sheet_names, sheet_name))
+            self.sheet_xmls.append(sheet_xml)
+
+    def save(self, output_file: str):
+        if not self.sheet_xmls:
+            raise IndexError("At least one sheet must be visible")
+
+        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("[Content_Types].xml", self._content_types_xml())
+            zf.writestr("_rels/.rels", _relationships_xml([("rId1", OFFICE_DOCUMENT_REL, "xl/workbook.xml")]))
+            zf.writestr("xl/workbook.xml", self._workbook_xml())
+            zf.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels_xml())
+            zf.writestr("xl/styles.xml", self._styles_xml())
+            zf.writestr("xl/sharedStrings.xml", self._shared_strings_xml())
+            if self.theme is not None:
+                zf.writestr("xl/theme/theme1.xml", self.theme)
+            for i, sheet_xml in enumerate(self.sheet_xmls, start=1):
+                zf.writestr(f"xl/worksheets/sheet{i}.xml", sheet_xml)
+
+    def _init_styles(self, package):
+        styles = package["styles"]
+        self.styles_root = styles["root"]
+        self.cell_style_xfs = styles["cellStyleXfs"]
+        self.cell_styles = styles["cellStyles"]
+        self.colors = styles["colors"]
+        self.theme = package["theme"]
+
+        # Keep the first file's tables exactly, so its own ids stay the same
+        for code, num_fmt_id in sorted(styles["numFmts"].items(), key=lambda item: item[1]):
+            self.num_fmts.setdefault(code, num_fmt_id)
+        for table, items in ((self.fonts, styles["fonts"]), (self.fills, styles["fills"]), (self.borders, styles["borders"])):
+            for item in items:
+                table.append(item)
+
+    def _merge_styles(self, styles) -> list[int]:
+        """
+        Add a source's styles to the output tables and return the output xf id of each source xf.
+        """
+        allowed_prefixes = {prefix for prefix, _ in _PREFIX_DECL_RE.findall(self.styles_root)} | {"xml"}
+
+        font_map = [self.fonts.add(_check_prefixes(font, allowed_prefixes)) for font in styles["fonts"]]
+        fill_map = [self.fills.add(_check_prefixes(fill, allowed_prefixes)) for fill in styles["fills"]]
+        border_map = [self.borders.add(_check_prefixes(border, allowed_prefixes)) for border in styles["borders"]]
+
+        num_fmt_map = {}
+        for code, num_fmt_id in styles["numFmts"].items():
+            if code not in self.num_fmts:
+                self.num_fmts[code] = max([FIRST_CUSTOM_NUM_FMT - 1, *self.num_fmts.values()]) + 1
+            num_fmt_map[num_fmt_id] = self.num_fmts[code]
+
+        # Named styles are only kept when they are the same as the first file's
+        same_named_styles = styles["cellStyleXfs"] == self.cell_style_xfs
+
+        maps = {
+            "fontId": font_map,
+            "fillId": fill_map,
+            "borderId": border_map,
+        }
+
+        def remap(match):
+            attr, value = match.group(2), int(match.group(3))
+            if attr == "numFmtId":
+                value = num_fmt_map.get(value, value) if value >= FIRST_CUSTOM_NUM_FMT else value
+            elif attr == "xfId":
+                value = value if same_named_styles else 0
+            else:
+                try:
+                    value = maps[attr][value]
+                except IndexError:
+                    raise TransplantError(f"Style refers to missing {attr} {value}")
+            return f"{match.group(1)}{value}{match.group(4)}"
+
+        return [
+            self.cell_xfs.add(_check_prefixes(_XF_ATTR_RE.sub(remap, xf), allowed_prefixes))
+            for xf in styles["cellXfs"]
+        ]
+
+    def _content_types_xml(self) -> str:
+        overrides = [
+            ("/xl/workbook.xml", CONTENT_TYPE + "sheet.main+xml"),
+            ("/xl/styles.xml", CONTENT_TYPE + "styles+xml"),
+            ("/xl/sharedStrings.xml", CONTENT_TYPE + "sharedStrings+xml"),
+        ]
+        if self.theme is not None:
+            overrides.append(("/xl/theme/theme1.xml", "application/vnd.openxmlformats-officedocument.theme+xml"))
+        overrides += [
+            (f"/xl/worksheets/sheet{i}.xml", CONTENT_TYPE + "worksheet+xml")
+            for i in range(1, len(self.sheet_xmls) + 1)
+        ]
+
+        return (
+            XML_HEADER
+            + f'<Types xmlns="{CONTENT_TYPES_NS}">'
+            + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            + '<Default Extension="xml" ContentType="application/xml"/>'
+            + "".join(f'<Override PartName="{part}" ContentType="{content_type}"/>' for part, content_type in overrides)
+            + "</Types>"
+        )
+
+    def _workbook_xml(self) -> str:
+        sheets = "".join(
+            f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self.sheet_names, start=1)
+        )
+        return (
+            XML_HEADER
+            + f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+            + '<bookViews><workbookView activeTab="0"/></bookViews>'
+            + f"<sheets>{sheets}</sheets>"
+            + "</workbook>"
+        )
+
+    def _workbook_rels_xml(self) -> str:
+        count = len(self.sheet_xmls)
+        relationships = [(f"rId{i}", WORKSHEET_REL, f"worksheets/sheet{i}.xml") for i in range(1, count + 1)]
+        relationships.append((f"rId{count + 1}", STYLES_REL, "styles.xml"))
+        relationships.append((f"rId{count + 2}", SHARED_STRINGS_REL, "sharedStrings.xml"))
+        if self.theme is not None:
+            relationships.append((f"rId{count + 3}", THEME_REL, "theme/theme1.xml"))
+        return _relationships_xml(relationships)
+
+    def _styles_xml(self) -> str:
+        num_fmts = "".join(
+            f'<numFmt numFmtId="{num_fmt_id}" formatCode={quoteattr(code)}/>'
+            for code, num_fmt_id in sorted(self.num_fmts.items(), key=lambda item: item[1])
+        )
+        cell_style_xfs = self.cell_style_xfs or ['<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>']
+        cell_styles = self.cell_styles or ['<cellStyle name="Normal" xfId="0" builtinId="0"/>']
+
+        return (
+            XML_HEADER
+            + self.styles_root
+            + (f'<numFmts count="{len(self.num_fmts)}">{num_fmts}</numFmts>' if self.num_fmts else "")
+            + _section_xml("fonts", self.fonts)
+            + _section_xml("fills", self.fills)
+            + _section_xml("borders", self.borders)
+            + _section_xml("cellStyleXfs", cell_style_xfs)
+            + _section_xml("cellXfs", self.cell_xfs)
+            + _section_xml("cellStyles", cell_styles)
+            + '<dxfs count="0"/>'
+            + '<tableStyles count="0" defaultTableStyle="TableStyleMedium9" defaultPivotStyle="PivotStyleLight16"/>'
+            + (self.colors or "")
+            + "</styleSheet>"
+        )
+
+    def _shared_strings_xml(self) -> str:
+        return (
+            XML_HEADER
+            + f'<sst xmlns="{MAIN_NS}" count="{len(self.shared_strings)}" uniqueCount="{len(self.shared_strings)}">'
+            + "".join(self.shared_strings)
+            + "</sst>"
+        )
+
+
+class _IndexedParts(list):
+    """
+    List of raw XML items that hands out the index of an equal item instead of adding it twice.
+    """
+    def __init__(self):
+        super().__init__()
+        self.indices = {}
+
+    def append(self, item):
+        self.indices.setdefault(item, len(self))
+        super().append(item)
+
+    def add(self, item) -> int:
+        index = self.indices.get(item)
+        if index is None:
+            index = len(self)
+            self.append(item)
+        return index
+
+
+def _read_package(source, sheet_names: list[str] | None = None) -> dict:
+    """
+    Read the parts of an .xlsx that are needed to copy the named sheets, or its active sheet.
+    """
+    try:
+        zf = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise TransplantError(str(e))
+
+    with zf:
+        names = set(zf.namelist())
+
+        root_rels = read_relationships(zf, "")
+        workbook_part = next((target for _, rel_type, target in root_rels if rel_type == OFFICE_DOCUMENT_REL), None)
+        if workbook_part is None or workbook_part not in names:
+            raise TransplantError("No workbook part found")
+
+        workbook_rels = read_relationships(zf, workbook_part)
+        rel_targets = {rel_id: (rel_type, target) for rel_id, rel_type, target in workbook_rels}
+
+        workbook = ET.fromstring(zf.read(workbook_part))
+        sheets = workbook.findall(f"{{{MAIN_NS}}}sheets/{{{MAIN_NS}}}sheet")
+        if sheet_names is None:
+            # Find the active sheet, like openpyxl's workbook.active
+            view = workbook.find(f"{{{MAIN_NS}}}bookViews/{{{MAIN_NS}}}workbookView")
+            active = int(view.get("activeTab", 0)) if view is not None else 0
+            if not 0 <= active < len(sheets):
+                raise TransplantError("Active sheet not found")
+            sheets = [sheets[active]]
+        else:
+            sheets_by_name = {sheet.get("name"): sheet for sheet in sheets}
+            missing = [sheet_name for sheet_name in sheet_names if sheet_name not in sheets_by_name]
+            if missing:
+                raise TransplantError(f"Sheet {missing[0]} not found")
+            sheets = [sheets_by_name[sheet_name] for sheet_name in sheet_names]
+
+        # Dates are stored as day numbers, which the 1900 based output would read 4 years off
+        properties = workbook.find(f"{{{MAIN_NS}}}workbookPr")
+        if properties is not None and properties.get("date1904", "").lower() in ("1", "true"):
+            raise TransplantError("Workbook uses the 1904 date system")
+
+        sheet_parts = []
+        for sheet in sheets:
+            rel_type, sheet_part = rel_targets.get(sheet.get(f"{{{REL_NS}}}id"), (None, None))
+            if rel_type != WORKSHEET_REL or sheet_part not in names:
+                raise TransplantError(f"Sheet {sheet.get('name')} is not a worksheet")
+
+            # Printer settings are the only sheet relationship that can be dropped
+            for _, sheet_rel_type, _ in read_relationships(zf, sheet_part):
+                if sheet_rel_type != PRINTER_SETTINGS_REL:
+                    raise TransplantError(f"Sheet has a {sheet_rel_type.rsplit('/', 1)[-1]} relationship")
+            sheet_parts.append(sheet_part)
+
+        parts = {rel_type: target for rel_type, target in rel_targets.values() if target in names}
+
+        return {
+            "sheets": [zf.read(sheet_part).decode("utf-8") for sheet_part in sheet_parts],
+            "styles": _parse_styles(zf.read(parts[STYLES_REL]).decode("utf-8") if STYLES_REL in parts else ""),
+            "shared_strings": _parse_shared_strings(zf.read(parts[SHARED_STRINGS_REL]).decode("utf-8")) if SHARED_STRINGS_REL in parts else [],
+            "theme": zf.read(parts[THEME_REL]) if THEME_REL in parts else None,
+        }
+
+
+def read_relationships(zf: zipfile.ZipFile, part: str) -> list[tuple[str, str, str]]:
+    """
+    Return (id, type, target part) of each relationship of a part ("" for the package itself).
+    """
+    folder, filename = posixpath.split(part)
+    rels_part = posixpath.join(folder, "_rels", filename + ".rels")
+    try:
+        root = ET.fromstring(zf.read(rels_part))
+    except KeyError:
+        return []
+
+    relationships = []
+    for rel in root.findall(f"{{{PACKAGE_REL_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            target = rel.get("Target")
+        elif rel.get("Target", "").startswith("/"):
+            target = rel.get("Target")[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(folder, rel.get("Target", "")))
+        relationships.append((rel.get("Id"), rel.get("Type"), target))
+    return relationships
+
+
+def _parse_styles(xml: str) -> dict:
+    if xml and not re.search(r"<styleSheet\b", xml):
+        raise TransplantError("Unsupported styles part")
+
+    root = re.search(r"<styleSheet\b[^>]*>", xml)
+    colors = re.search(r"<colors\b.*?</colors>", xml, re.S)
+
+    num_fmts = {}
+    num_fmts_xml = re.search(r"<numFmts\b.*?</numFmts>", xml, re.S)
+    if num_fmts_xml:
+        for num_fmt in ET.fromstring(num_fmts_xml.group(0).replace("<numFmts", f'<numFmts xmlns="{MAIN_NS}"', 1)):
+            num_fmts[num_fmt.get("formatCode")] = int(num_fmt.get("numFmtId"))
+
+    return {
+        "root": root.group(0) if root else f'<styleSheet xmlns="{MAIN_NS}">',
+        "numFmts": num_fmts,
+        "fonts": _section_items(xml, "fonts", "font"),
+        "fills": _section_items(xml, "fills", "fill"),
+        "borders": _section_items(xml, "borders", "border"),
+        "cellStyleXfs": _section_items(xml, "cellStyleXfs", "xf"),
+        "cellXfs": _section_items(xml, "cellXfs", "xf"),
+        "cellStyles": _section_items(xml, "cellStyles", "cellStyle"),
+        "colors": colors.group(0) if colors else None,
+    }
+
+
+def _parse_shared_strings(xml: str) -> list[str]:
+    if not re.search(r"<sst\b", xml):
+        raise TransplantError("Unsupported shared strings part")
+    return [_check_prefixes(si, {"xml"}) for si in re.findall(r"<si\b[^>]*?(?:/>|>.*?</si>)", xml, re.S)]
+
+
+def _section_items(xml: str, section: str, item: str) -> list[str]:
+    match = re.search(rf"<{section}\b[^>]*?(?:/>|>(.*?)</{section}>)", xml, re.S)
+    if not match or match.group(1) is None:
+        return []
+    return re.findall(rf"<{item}\b[^>]*?(?:/>|>.*?</{item}>)", match.group(1), re.S)
+
+
+def _section_xml(section: str, items: list[str]) -> str:
+    return f'<{section} count="{len(items)}">{"".join(items)}</{section}>'
+
+
+def _check_prefixes(item: str, allowed_prefixes: set[str]) -> str:
+    # A namespace prefix that is not declared in the output part would make the XML invalid
+    for tag in _TAG_RE.findall(item):
+        for prefix in _TAG_PREFIX_RE.findall(tag):
+            if prefix not in allowed_prefixes:
+                raise TransplantError(f"Unsupported namespace prefix {prefix}")
+    return item
+
+
+def _rewrite_sheet(xml: str, style_map: list[int], string_map: list[int]) -> str:
+    """
+    Point the style ids and shared string indices of a sheet at the output workbook's tables.
+    """
+    if not re.search(r"<worksheet\b", xml):
+        raise TransplantError("Unsupported worksheet part")
+    if "dxfId" in xml:
+        raise TransplantError("Sheet uses differential formats")
+
+    # Drop the printer settings link, any other relationship can't be carried over
+    rel_prefixes = [prefix for prefix, namespace in _PREFIX_DECL_RE.findall(xml) if namespace == REL_NS]
+    for prefix in rel_prefixes:
+        xml = re.sub(rf'(<pageSetup\b[^>]*?)\s{prefix}:id="[^"]*"', r"\1", xml)
+        if f"{prefix}:id=" in xml:
+            raise TransplantError("Sheet refers to other parts of its workbook")
+
+    def remap_style(match):
+        try:
+            return f"{match.group(1)}{style_map[int(match.group(2))]}{match.group(3)}"
+        except IndexError:
+            raise TransplantError(f"Sheet refers to missing style {match.group(2)}")
+
+    def remap_string(match):
+        try:
+            return f"{match.group(1)}{string_map[int(match.group(2))]}{match.group(3)}"
+        except IndexError:
+            raise TransplantError(f"Sheet refers to missing shared string {match.group(2)}")
+
+    def rewrite_cell(match):
+        attrs, end, inner = match.groups()
+        attrs = _STYLE_ATTR_RE.sub(remap_style, attrs)
+        if inner is None:
+            return f"<c{attrs}{end}"
+        if _SHARED_STRING_TYPE_RE.search(attrs):
+            inner = _VALUE_RE.sub(remap_string, inner, count=1)
+        return f"<c{attrs}>{inner}</c>"
+
+    # Only one sheet of the output can be the selected tab
+    xml = _TAB_SELECTED_RE.sub("", xml)
+    xml = _ROW_RE.sub(lambda match: _STYLE_ATTR_RE.sub(remap_style, match.group(0)), xml)
+    xml = _COL_RE.sub(lambda match: _COL_STYLE_ATTR_RE.sub(remap_style, match.group(0)), xml)
+    return _CELL_RE.sub(rewrite_cell, xml)
+
+
+def _relationships_xml(relationships: list[tuple[str, str, str]]) -> str:
+    return (
+        XML_HEADER
+        + f'<Relationships xmlns="{PACKAGE_REL_NS}">'
+        + "".join(f'<Relationship Id="{rel_id}" Type="{rel_type}" Target="{target}"/>' for rel_id, rel_type, target in relationships)
+        + "</Relationships>"
+    )